@@ -0,0 +1,87 @@
+"""Run the benchmark suite against the stand-in FEMM backend.
+
+    python -m benchmarks                 # Run every benchmark and compare against the saved baselines.
+    python -m benchmarks stator points   # Run a subset of the benchmarks.
+    python -m benchmarks --save          # Store the results as the new baselines.
+
+A metric is flagged as a regression when it is more than ``--tolerance`` (20% by
+default) worse than its baseline, in which case the exit code is 1. Baselines are
+machine specific so they are not part of the repository, save them with ``--save`` on
+the machine the comparison is made on. Without them the results are only reported."""
+import argparse
+import json
+import os
+import sys
+
+from .workloads import BENCHMARKS
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+
+def load_baselines():
+    if not os.path.exists(BASELINES_PATH):
+        return {}
+    with open(BASELINES_PATH) as f:
+        return json.load(f)
+
+
+def save_baselines(metrics):
+    baselines = load_baselines()
+    baselines.update({
+        name: {'value': value, 'higher_is_better': higher_is_better}
+        for name, (value, higher_is_better) in metrics.items()
+    })
+    with open(BASELINES_PATH, 'w') as f:
+        json.dump(baselines, f, indent=4, sort_keys=True)
+
+
+def compare(metrics, baselines, tolerance):
+    """Print every metric next to its baseline and return the names of the regressions."""
+
+    regressions = []
+    name_width = max(len(name) for name in metrics)
+    print(f'{"METRIC":<{name_width}}{"VALUE":>14}{"BASELINE":>14}{"CHANGE":>10}')
+    for name, (value, higher_is_better) in metrics.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f'{name:<{name_width}}{value:>14.3f}{"-":>14}{"-":>10}')
+            continue
+        change = (value - baseline['value']) / baseline['value']
+        worse = -change if higher_is_better else change
+        flag = '  REGRESSION' if worse > tolerance else ''
+        if flag:
+            regressions.append(name)
+        print(f'{name:<{name_width}}{value:>14.3f}{baseline["value"]:>14.3f}{change:>10.1%}{flag}')
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f'Benchmarks to run, any of {", ".join(BENCHMARKS)} (default all).')
+    parser.add_argument('--save', action='store_true', help='Store the results as the new baselines.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed fractional slowdown.')
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(sorted(unknown))}')
+
+    metrics = {}
+    for name in args.benchmarks or BENCHMARKS:
+        print(f'Running {name} benchmark...')
+        metrics.update(BENCHMARKS[name]())
+    baselines = load_baselines()
+    regressions = compare(metrics, baselines, args.tolerance)
+    if not baselines and not args.save:
+        print('No baselines saved on this machine, run with --save to store them.')
+    if args.save:
+        save_baselines(metrics)
+        print(f'Baselines saved to {BASELINES_PATH}.')
+    elif regressions:
+        print(f'{len(regressions)} regression(s) found.')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
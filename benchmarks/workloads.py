@@ -0,0 +1,256 @@
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from functools import partial
+
+import numpy as np
+
+from python_femm.core.archive import SolutionArchive
+from python_femm.core.backends import DummyBackend
+from python_femm.core.model import Model
+from python_femm.core.pool import WorkerPool, get_context, PRELOAD_MODULES
+from python_femm.core.postprocessing import ParallelPost
+from python_femm.core.scenes import Scene, SceneRunner
+from python_femm.core.wrapper import FEMMSession
+
+SLOT_COUNT = 48
+POINT_COUNT = 2000
+SCENE_SOLVE_DELAY = 0.05
+SCENE_WORKER_COUNTS = (1, 2, 4)
+STARTUP_WORKER_COUNT = 4
+POST_TASK_COUNT = 1000
+POST_REPLY_DELAY = 0.0005
+POST_WORKER_COUNT = 4
+ARCHIVE_NODE_COUNT = 20000
+ARCHIVE_POINT_COUNT = 10
+
+
+def _best_time(function, repeat):
+    """Return the result and the fastest wall time of ``repeat`` runs of ``function``."""
+
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def _new_session():
+    session = FEMMSession(backend=DummyBackend())
+    session.new_document('magnetics')
+    return session
+
+
+def _draw_stator(session):
+    pre = session.pre
+    pre.draw_annulus(points=[[0, 0]], inner_radius=50, outer_radius=80, max_seg=1, group=1)
+    slot_angle = np.pi / SLOT_COUNT
+    slot = [
+        [50 * np.cos(slot_angle / 2), 50 * np.sin(slot_angle / 2)],
+        [65 * np.cos(slot_angle / 2), 65 * np.sin(slot_angle / 2)],
+        [65 * np.cos(slot_angle / 2), -65 * np.sin(slot_angle / 2)],
+        [50 * np.cos(slot_angle / 2), -50 * np.sin(slot_angle / 2)],
+    ]
+    pre.draw_pattern(commands=[
+        (pre.draw_polygon, {'points': slot, 'group': 2}),
+        (pre.add_block_label, {'points': [[57.5, 0]], 'block_name': 'Copper', 'in_circuit': 'A{i}', 'turns': 10}),
+    ], center=[0, 0], repeat=SLOT_COUNT)
+
+
+def bench_stator_build(repeat=3):
+    """Draw a patterned 48 slot stator and report the number of commands sent per second."""
+
+    def build():
+        session = _new_session()
+        _draw_stator(session)
+        return session.backend.call_count
+
+    call_count, elapsed = _best_time(build, repeat)
+    return {
+        'stator_build_seconds': (elapsed, False),
+        'stator_commands_per_second': (call_count / elapsed, True),
+    }
+
+
+def bench_point_values(repeat=3):
+    """Extract the point values at ``POINT_COUNT`` points and report the overhead per point."""
+
+    session = _new_session()
+    points = np.random.default_rng(0).uniform(-80, 80, size=(POINT_COUNT, 2)).tolist()
+
+    def extract():
+        for x, y in points:
+            session.post.get_point_values(x, y)
+
+    _, elapsed = _best_time(extract, repeat)
+    return {'point_values_us_per_point': (elapsed / POINT_COUNT * 1e6, False)}
+
+
+class BenchmarkModel(Model):
+    backend = partial(DummyBackend, solve_delay=SCENE_SOLVE_DELAY)
+
+    def pre(self, x_value=None, y_value=None):
+        self.session.new_document('magnetics')
+        self.session.pre.draw_circle(points=[[0, 0]], radius=10 + x_value, max_seg=1)
+        self.session.pre.add_block_label(points=[[0, 0]])
+
+    def solve(self):
+        self.session.pre.analyze()
+        self.session.pre.load_solution()
+
+    def post(self):
+        self.session.post.select_block(points=[[0, 0]])
+        return self.session.post.block_integral(19)
+
+
+class BenchmarkScene2D(Scene):
+    model = BenchmarkModel()
+    iterations = 16
+    mode = '2d'
+
+    def display_results(self, results):
+        pass
+
+
+class BenchmarkScene3D(BenchmarkScene2D):
+    iterations = 4
+    mode = '3d'
+
+
+def bench_scenes(worker_counts=SCENE_WORKER_COUNTS):
+    """Run 2D and 3D scenes with a synthetic solve delay on several worker counts and
+    report the throughput and the scaling efficiency relative to a single worker."""
+
+    metrics = {}
+    # Submit the points in grid order and keep the recorded costs out of the working tree,
+    # so every run schedules the same way whatever the previous runs measured.
+    with tempfile.TemporaryDirectory() as costs_directory:
+        runner_class = partial(SceneRunner, order_by_cost=False, costs_directory=costs_directory)
+        # The first run starts the fork server, a one-off cost covered by the startup benchmark.
+        with contextlib.redirect_stdout(io.StringIO()):
+            runner_class(processes=1).start(BenchmarkScene2D())
+        for scene_class in (BenchmarkScene2D, BenchmarkScene3D):
+            scene = scene_class()
+            point_count = scene.iterations if scene.mode == '2d' else scene.iterations ** 2
+            single_worker_time = None
+            for worker_count in worker_counts:
+                runner = runner_class(processes=worker_count)
+                # The runner reports its progress, which would drown out the benchmark output.
+                with contextlib.redirect_stdout(io.StringIO()):
+                    _, elapsed = _best_time(partial(runner.start, scene), 1)
+                if single_worker_time is None:
+                    single_worker_time = elapsed * worker_count
+                metrics[f'scene_{scene.mode}_points_per_second_{worker_count}_workers'] = (
+                    point_count / elapsed, True)
+                metrics[f'scene_{scene.mode}_scaling_efficiency_{worker_count}_workers'] = (
+                    single_worker_time / (worker_count * elapsed), True)
+    return metrics
+
+
+def _start_session(_):
+    """Start a session on a stand-in backend, as the first point of a worker would."""
+
+    _new_session().post.get_point_values(0, 0)
+
+
+def bench_worker_startup(repeat=3):
+    """Start a pool of workers with each available start method, run a session in every
+    worker and report the time taken until all of them have finished."""
+
+    metrics = {}
+    for start_method in ('spawn', 'forkserver'):
+        if start_method not in mp.get_all_start_methods():
+            continue
+        context = get_context(start_method, [*PRELOAD_MODULES, __name__])
+
+        def start():
+            with WorkerPool(STARTUP_WORKER_COUNT, context=context) as pool:
+                for _ in pool.run(_start_session, range(STARTUP_WORKER_COUNT)):
+                    pass
+
+        # The first run starts the fork server, later runs measure forking from it.
+        start()
+        _, elapsed = _best_time(start, repeat)
+        metrics[f'worker_startup_ms_{start_method}'] = (elapsed * 1e3, False)
+    return metrics
+
+
+def _point_value(post, x, y):
+    return post.get_point_values(x, y)[0]
+
+
+def bench_parallel_post(repeat=3):
+    """Evaluate ``POST_TASK_COUNT`` point queries against one solution with a synthetic
+    COM latency, serially and on ``POST_WORKER_COUNT`` post-processing workers."""
+
+    backend = partial(DummyBackend, reply_delay=POST_REPLY_DELAY)
+    tasks = [partial(_point_value, x=x, y=0) for x in range(POST_TASK_COUNT)]
+    session = FEMMSession(backend=backend())
+    session.open_document('benchmark.ans')
+    _, serial_time = _best_time(lambda: [task(session.post) for task in tasks], repeat)
+    with ParallelPost('benchmark.ans', processes=POST_WORKER_COUNT, backend=backend) as post:
+        # Wait for every worker to open the solution before timing.
+        post.map(tasks[:POST_WORKER_COUNT])
+        _, parallel_time = _best_time(partial(post.map, tasks), repeat)
+    return {
+        'post_tasks_per_second_serial': (POST_TASK_COUNT / serial_time, True),
+        f'post_tasks_per_second_{POST_WORKER_COUNT}_workers': (POST_TASK_COUNT / parallel_time, True),
+    }
+
+
+def _write_solution(path, nodes, elements, current):
+    """Write a magnetics solution laid out as FEMM writes it, ``current`` scales the potential
+    so the points of a current sweep share their mesh."""
+
+    lines = ['[Format]      =  4.0', '[Frequency]   =  0', '[Precision]   =  1e-08', '[Units]       =  "millimeters"',
+             '[ProblemType] =  "planar"', '[BlockProps]  = 1', '  <BeginBlock>', '    <BlockName> = "Copper"',
+             f'    <Jr> = {current}', '  <EndBlock>', '[Solution]', str(len(nodes))]
+    potential = current * 1e-3 * np.hypot(nodes[:, 0], nodes[:, 1])
+    lines += [f'{x:.17g}\t{y:.17g}\t{a:.17g}' for (x, y), a in zip(nodes.tolist(), potential.tolist())]
+    lines.append(str(len(elements)))
+    lines += ['\t'.join(str(value) for value in element) for element in elements.tolist()]
+    lines += ['1', f'1\t{current}\t0']
+    with open(path, 'w', newline='') as f:
+        f.write('\r\n'.join(lines) + '\r\n')
+
+
+def bench_archive(repeat=3):
+    """Archive the solutions of a current sweep sharing one mesh, as float64 and float32, and
+    report the size of the archive relative to the solution files and the time to add and
+    restore a solution."""
+
+    rng = np.random.default_rng(0)
+    nodes = rng.uniform(-80, 80, size=(ARCHIVE_NODE_COUNT, 2))
+    elements = np.column_stack([rng.integers(0, ARCHIVE_NODE_COUNT, size=(2 * ARCHIVE_NODE_COUNT, 3)),
+                                rng.integers(0, 4, size=2 * ARCHIVE_NODE_COUNT)])
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        solutions = []
+        for point in range(ARCHIVE_POINT_COUNT):
+            solutions.append(os.path.join(directory, f'point_{point}.ans'))
+            _write_solution(solutions[-1], nodes, elements, current=point + 1)
+        solution_size = sum(os.path.getsize(path) for path in solutions)
+        for values_dtype in ('float64', 'float32'):
+            archive = SolutionArchive(os.path.join(directory, values_dtype), values_dtype=values_dtype)
+            _, add_time = _best_time(lambda: [archive.add(f'{index}', path) for index, path in enumerate(solutions)], 1)
+            metrics[f'archive_size_ratio_{values_dtype}'] = (solution_size / archive.size(), True)
+        _, restore_time = _best_time(partial(archive.restore, '0', os.path.join(directory, 'restored')), repeat)
+    metrics['archive_add_ms_per_solution'] = (add_time / ARCHIVE_POINT_COUNT * 1e3, False)
+    metrics['archive_restore_ms_per_solution'] = (restore_time * 1e3, False)
+    return metrics
+
+
+BENCHMARKS = {
+    'stator': bench_stator_build,
+    'points': bench_point_values,
+    'scenes': bench_scenes,
+    'startup': bench_worker_startup,
+    'post': bench_parallel_post,
+    'archive': bench_archive,
+}
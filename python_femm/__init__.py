@@ -1,6 +1,32 @@
-from .core.model import Model
-from .core.scenes import Scene
-from .core.manage import run_command
-from .core.utils import get_paths
+import importlib
+
+# The public names and the modules they live in. They are imported on first access
+# (PEP 562) so importing the package, e.g. in every scene worker, stays cheap.
+_EXPORTS = {
+    'Model': '.core.model',
+    'Scene': '.core.scenes',
+    'ResultSchema': '.core.results',
+    'run_command': '.core.manage',
+    'get_paths': '.core.utils',
+    'RectangularGrid': '.core.fields',
+    'PolarGrid': '.core.fields',
+    'FieldMap': '.core.fields',
+    'ParallelPost': '.core.postprocessing',
+    'SolutionArchive': '.core.archive',
+}
+
+__all__ = list(_EXPORTS)
 
 name = 'python-femm'
+
+
+def __getattr__(attribute):
+    if attribute not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {attribute!r}')
+    value = getattr(importlib.import_module(_EXPORTS[attribute], __name__), attribute)
+    globals()[attribute] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,156 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .scratch import create_run_directory, remove_run_directory
+from .wrapper import FEMMSession
+
+
+def _initialise_thread():
+    """COM has to be initialised on every thread that talks to FEMM through ActiveX."""
+
+    try:
+        import pythoncom
+    except ImportError:
+        return
+    pythoncom.CoInitialize()
+
+
+class AsyncAPI:
+    """Exposes the methods of a ``PreprocessorAPI`` or ``PostProcessorAPI`` as coroutines
+    that run on the thread of their session."""
+
+    def __init__(self, session, name):
+        self._session = session
+        self._name = name
+
+    def __getattr__(self, name):
+        async def method(*args, **kwargs):
+            api = getattr(self._session.session, self._name)
+            return await self._session.run(getattr(api, name), *args, **kwargs)
+
+        method.__name__ = name
+        return method
+
+
+class AsyncFEMMSession:
+    """Drives a ``FEMMSession`` from asyncio. All calls to FEMM run on a thread owned by this
+    session, so an event loop can overlap the work of several sessions (e.g. draw the next
+    design in one while another solves) without the pickling of a process pool.
+
+    ``backend`` is a backend class or factory, it is created on the session thread.
+    ``directory`` is the working directory of FEMM, give every session its own so their
+    files don't clobber each other::
+
+        async with AsyncFEMMSession() as femm:
+            await femm.new_document('magnetics')
+            await femm.pre.draw_circle(points=[[0, 0]], radius=10, max_seg=1)
+            await femm.analyze()
+            await femm.load_solution()
+            values = await femm.post_many('get_point_values', [(0, 0), (5, 0)])
+    """
+
+    def __init__(self, profile=False, backend=None, directory=None):
+        self.profile = profile
+        self.backend = backend
+        self.directory = directory
+        self.session = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='femm',
+                                           initializer=_initialise_thread)
+        self.pre = AsyncAPI(self, 'pre')
+        self.post = AsyncAPI(self, 'post')
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def start(self):
+        self.session = await self.run(self._create_session)
+
+    def _create_session(self):
+        # COM objects have to be created on the thread that uses them.
+        backend = self.backend() if self.backend is not None else None
+        return FEMMSession(profile=self.profile, backend=backend, directory=self.directory)
+
+    async def run(self, function, *args, **kwargs):
+        """Call ``function`` on the session thread and wait for the result."""
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(function, *args, **kwargs))
+
+    async def close(self):
+        # Waiting for the session thread to finish its last call would block the event loop.
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(self.executor.shutdown, wait=True))
+
+    async def new_document(self, doctype):
+        await self.run(self.session.new_document, doctype)
+
+    async def open_document(self, filename):
+        await self.run(self.session.open_document, filename)
+
+    async def analyze(self, minimized=False):
+        """Solve the current document. The session thread is blocked until the solver finishes
+        but the event loop is free to drive other sessions."""
+
+        await self.run(self.session.pre.analyze, minimized=minimized)
+
+    async def load_solution(self):
+        await self.run(self.session.pre.load_solution)
+
+    async def post_many(self, name, args_list):
+        """Call the postprocessor method ``name`` once for each tuple of arguments in
+        ``args_list`` within a single hop to the session thread and return the results in
+        order, e.g. ``await session.post_many('get_point_values', [(0, 0), (1, 0)])``."""
+
+        def query():
+            method = getattr(self.session.post, name)
+            return [method(*args) for args in args_list]
+
+        return await self.run(query)
+
+    def stats(self):
+        return self.session.stats()
+
+
+async def run_pipeline(model_class, points, session_count=2, backend=None, scratch_root=None):
+    """Run ``pre``, ``solve`` and ``post`` of ``model_class`` for every ``(x_value, y_value)``
+    in ``points`` on ``session_count`` sessions at once. While one session is solving the
+    others are drawing or post-processing. Returns the results of ``post`` in the order of
+    ``points``. Like scene workers, every session runs FEMM in its own scratch directory
+    inside ``scratch_root``, which is removed at the end."""
+
+    queue = asyncio.Queue()
+    for index, point in enumerate(points):
+        queue.put_nowait((index, point))
+    results = [None] * len(points)
+    run_directory = create_run_directory(scratch_root)
+
+    async def work(session_index):
+        directory = os.path.join(run_directory, f'session-{session_index}')
+        os.makedirs(directory)
+        async with AsyncFEMMSession(backend=backend or model_class.backend, directory=directory) as session:
+            model = model_class(session=session.session)
+            model.working_directory = directory
+            while not queue.empty():
+                index, (x_value, y_value) = queue.get_nowait()
+                model.point = (x_value, y_value)
+                await session.run(model.pre, x_value=x_value, y_value=y_value)
+                await session.run(model.solve)
+                results[index] = await session.run(model.post)
+
+    tasks = [asyncio.ensure_future(work(session_index)) for session_index in range(min(session_count, len(points)))]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # When a point raises, stop the other sessions and wait for their threads to finish
+        # before their directories are removed.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        remove_run_directory(run_directory)
+    return results
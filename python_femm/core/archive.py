@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+
+import numpy as np
+
+# Solutions of the four problem types, the input files are the header of their solution.
+SOLUTION_EXTENSIONS = ('.ans', '.res', '.anh', '.anc')
+
+SOLUTION_MARKER = '[solution]'
+
+# FEMM writes its files in the ANSI code page, latin-1 maps every byte to a character so
+# the text round-trips unchanged whatever the code page was.
+ENCODING = 'latin-1'
+
+
+class ParsedSolution:
+    """The sections of a FEMM solution file: the text up to and including the ``[Solution]``
+    line, the nodes (x, y and the values of each node), the elements (node indices and block
+    label of each element) and the remaining text (circuits, boundaries...)."""
+
+    def __init__(self, header, nodes, elements, tail, newline='\n', values_dtype=np.float64):
+        self.header = header
+        self.nodes = nodes
+        self.elements = elements
+        self.tail = tail
+        self.newline = newline
+        # The values are written with the precision they were stored with.
+        self.values_dtype = np.dtype(values_dtype)
+
+    @classmethod
+    def read(cls, path):
+        with open(path, newline='', encoding=ENCODING) as f:
+            text = f.read()
+        newline = '\r\n' if '\r\n' in text else '\n'
+        lines = text.split(newline)
+        try:
+            start = next(index for index, line in enumerate(lines) if line.strip().lower() == SOLUTION_MARKER) + 1
+        except StopIteration:
+            raise ValueError(f'{path} is not a FEMM solution, it has no [Solution] section.')
+        header = newline.join(lines[:start]) + newline
+        nodes, start = _read_table(lines, start, np.float64, path)
+        elements, start = _read_table(lines, start, np.float64, path)
+        if elements.size and np.array_equal(elements, np.round(elements)):
+            elements = elements.astype(np.int32)
+        return cls(header, nodes, elements, newline.join(lines[start:]), newline)
+
+    def write(self, path):
+        """Write the solution to ``path``. Every number is written with the fewest digits
+        that read back as the same value, so the values are exact but may be spelt
+        differently from the original file (e.g. ``1.50`` is written ``1.5``)."""
+
+        value_format = _format_float32 if self.values_dtype == np.float32 else _format_float
+        node_formats = [_format_float] * 2 + [value_format] * (self.nodes.shape[1] - 2)
+        element_formats = [str if self.elements.dtype.kind in 'iu' else _format_float] * self.elements.shape[1]
+        with open(path, 'w', newline='', encoding=ENCODING) as f:
+            f.write(self.header)
+            for table, formats in ((self.nodes, node_formats), (self.elements, element_formats)):
+                f.write(f'{len(table)}{self.newline}')
+                f.writelines('\t'.join([fmt(value) for fmt, value in zip(formats, row)]) + self.newline
+                             for row in table.tolist())
+            f.write(self.tail)
+
+
+def _format_float(value):
+    """The shortest text that reads back as ``value``, without a trailing ``.0``."""
+
+    text = repr(value)
+    return text[:-2] if text.endswith('.0') else text
+
+
+def _format_float32(value):
+    # Values stored as float32 have already lost the digits beyond these.
+    return '%.9g' % value
+
+
+def _read_table(lines, start, dtype, path):
+    """Read a count followed by that many rows of numbers from ``lines``."""
+
+    try:
+        count = int(lines[start])
+        tokens = ' '.join(lines[start + 1:start + 1 + count]).split()
+        table = np.array(tokens, dtype=dtype).reshape(count, -1) if count else np.empty((0, 0), dtype)
+        if count and len(lines[start + 1].split()) != table.shape[1]:
+            raise ValueError
+    except (IndexError, ValueError):
+        raise ValueError(f'The solution section of {path} could not be read.')
+    return table, start + 1 + count
+
+
+def _atomic_save(path, array):
+    """Save ``array`` to ``path`` through a temporary file, so concurrent writers of the
+    same mesh never leave a partial file."""
+
+    descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.npy')
+    with os.fdopen(descriptor, 'wb') as f:
+        np.save(f, array)
+    os.replace(temporary_path, path)
+
+
+class SolutionArchive:
+    """A directory storing FEMM solutions in a compact binary form. Each solution is split
+    into its mesh (node coordinates and elements) and the values at its nodes, both stored
+    as ``.npy`` files that can be memory-mapped. A mesh is stored once and shared by every
+    solution with the same geometry, e.g. the points of a current or material sweep. The
+    text before and after the mesh (the input file, circuits...) is compressed with zlib.
+    Pass ``values_dtype='float32'`` to halve the size of the values at the cost of precision.
+
+    ``restore`` writes a solution back to a file FEMM can open. A scene stores the solutions
+    of the points selected by ``keep_solution`` in its ``solution_archive`` when it has one."""
+
+    def __init__(self, path, values_dtype=np.float64):
+        self.path = path
+        self.values_dtype = np.dtype(values_dtype)
+
+    def _mesh_directory(self, mesh):
+        return os.path.join(self.path, 'meshes', mesh)
+
+    def _point_directory(self, key):
+        return os.path.join(self.path, 'points', key)
+
+    def add(self, key, solution_path):
+        """Store the solution file at ``solution_path`` under ``key``."""
+
+        solution = ParsedSolution.read(solution_path)
+        coordinates = np.ascontiguousarray(solution.nodes[:, :2])
+        elements = np.ascontiguousarray(solution.elements)
+        digest = hashlib.sha1()
+        for array in (coordinates, elements):
+            digest.update(f'{array.dtype.str}{array.shape}'.encode())
+            digest.update(array.tobytes())
+        mesh = digest.hexdigest()
+
+        mesh_directory = self._mesh_directory(mesh)
+        if not os.path.exists(os.path.join(mesh_directory, 'elements.npy')):
+            os.makedirs(mesh_directory, exist_ok=True)
+            _atomic_save(os.path.join(mesh_directory, 'nodes.npy'), coordinates)
+            _atomic_save(os.path.join(mesh_directory, 'elements.npy'), elements)
+
+        point_directory = self._point_directory(key)
+        os.makedirs(point_directory, exist_ok=True)
+        np.save(os.path.join(point_directory, 'values.npy'), solution.nodes[:, 2:].astype(self.values_dtype))
+        for name, text in (('header', solution.header), ('tail', solution.tail)):
+            with open(os.path.join(point_directory, f'{name}.zlib'), 'wb') as f:
+                f.write(zlib.compress(text.encode(ENCODING)))
+        with open(os.path.join(point_directory, 'meta.json'), 'w') as f:
+            json.dump({
+                'mesh': mesh,
+                'file_name': os.path.basename(solution_path),
+                'newline': solution.newline,
+            }, f)
+        return key
+
+    def add_directory(self, directory, key_prefix):
+        """Store every solution file in ``directory`` under ``<key_prefix>_<file name>``."""
+
+        keys = []
+        for file_name in sorted(os.listdir(directory)):
+            stem, extension = os.path.splitext(file_name)
+            if extension.lower() in SOLUTION_EXTENSIONS:
+                keys.append(self.add(f'{key_prefix}_{stem}', os.path.join(directory, file_name)))
+        return keys
+
+    def keys(self):
+        directory = os.path.join(self.path, 'points')
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def __contains__(self, key):
+        return os.path.exists(os.path.join(self._point_directory(key), 'meta.json'))
+
+    def meta(self, key):
+        with open(os.path.join(self._point_directory(key), 'meta.json')) as f:
+            return json.load(f)
+
+    def mesh(self, key):
+        """Return the memory-mapped node coordinates (n, 2) and elements of ``key``."""
+
+        mesh_directory = self._mesh_directory(self.meta(key)['mesh'])
+        return (np.load(os.path.join(mesh_directory, 'nodes.npy'), mmap_mode='r'),
+                np.load(os.path.join(mesh_directory, 'elements.npy'), mmap_mode='r'))
+
+    def values(self, key):
+        """Return the memory-mapped values at the nodes of ``key``, one column per value."""
+
+        return np.load(os.path.join(self._point_directory(key), 'values.npy'), mmap_mode='r')
+
+    def _read_text(self, key, name):
+        with open(os.path.join(self._point_directory(key), f'{name}.zlib'), 'rb') as f:
+            return zlib.decompress(f.read()).decode(ENCODING)
+
+    def load(self, key):
+        """Return the solution stored under ``key`` as a ``ParsedSolution``."""
+
+        meta = self.meta(key)
+        coordinates, elements = self.mesh(key)
+        values = self.values(key)
+        nodes = np.hstack([coordinates, values])
+        return ParsedSolution(self._read_text(key, 'header'), nodes, np.asarray(elements),
+                              self._read_text(key, 'tail'), meta['newline'], values.dtype)
+
+    def restore(self, key, directory):
+        """Write the solution stored under ``key`` into ``directory`` with its original file
+        name and return its path."""
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.meta(key)['file_name'])
+        self.load(key).write(path)
+        return path
+
+    def size(self):
+        """Return the size of the archive on disk in bytes."""
+
+        return sum(os.path.getsize(os.path.join(root, file_name))
+                   for root, _, file_names in os.walk(self.path) for file_name in file_names)
@@ -0,0 +1,98 @@
+import contextlib
+import csv
+import re
+import subprocess
+import time
+
+# Number of values returned by ``getpointvalues`` in each mode, keyed by doctype prefix.
+POINT_VALUE_COUNTS = {
+    'm': 14,
+    'e': 8,
+    'h': 7,
+    'c': 11,
+}
+
+COMMAND_PATTERN = re.compile(r'(?:([mehc])[io]_)?(\w+)\(')
+
+# Called with the process id of every FEMM instance started by an ``ActiveFEMMBackend``.
+_start_hooks = []
+# Serialises starting FEMM between processes so each new process id is attributed correctly.
+_start_lock = None
+
+
+def add_start_hook(hook):
+    """Call ``hook`` with the process id of every FEMM instance started from now on, e.g.
+    so a stuck instance can be killed. Finding the id costs a ``tasklist`` call, so it is
+    only done while a hook is registered."""
+
+    _start_hooks.append(hook)
+
+
+def set_start_lock(lock):
+    """Set a ``multiprocessing.Lock`` shared by the processes starting FEMM."""
+
+    global _start_lock
+    _start_lock = lock
+
+
+def _femm_process_ids():
+    output = subprocess.run(['tasklist', '/FI', 'IMAGENAME eq femm.exe', '/FO', 'CSV', '/NH'],
+                            capture_output=True, text=True).stdout
+    return {int(row[1]) for row in csv.reader(output.splitlines()) if len(row) > 1 and row[1].isdigit()}
+
+
+class ActiveFEMMBackend:
+    """Sends commands to FEMM 4.2 through its ActiveX interface."""
+
+    def __init__(self):
+        import win32com.client
+
+        if not _start_hooks:
+            self.femm = win32com.client.Dispatch('femm.ActiveFEMM')
+            return
+        with _start_lock or contextlib.nullcontext():
+            existing = _femm_process_ids()
+            self.femm = win32com.client.Dispatch('femm.ActiveFEMM')
+            started = _femm_process_ids() - existing
+        for pid in started:
+            for hook in _start_hooks:
+                hook(pid)
+
+    def mlab2femm(self, string):
+        return self.femm.mlab2femm(string)
+
+
+class DummyBackend:
+    """A stand-in for FEMM that accepts every command and replies in the same format
+    as FEMM would. ``solve_delay`` is the time in seconds each ``analyze`` takes and
+    ``reply_delay`` is added to every command to emulate the latency of COM. Used to
+    benchmark the framework and run scenes without FEMM installed."""
+
+    def __init__(self, solve_delay=0, reply_delay=0):
+        self.solve_delay = solve_delay
+        self.reply_delay = reply_delay
+        self.call_count = 0
+
+    def mlab2femm(self, string):
+        self.call_count += 1
+        if self.reply_delay:
+            time.sleep(self.reply_delay)
+        match = COMMAND_PATTERN.match(string)
+        if match is None:
+            return ''
+        prefix, command = match.groups()
+        if command == 'analyze':
+            time.sleep(self.solve_delay)
+        elif command == 'getpointvalues':
+            return self._reply(float(value) for value in range(POINT_VALUE_COUNTS[prefix]))
+        elif command == 'blockintegral':
+            return self._reply([1.0])
+        elif command == 'lineintegral':
+            return self._reply([1.0, 0.0])
+        elif command == 'createmesh':
+            return self._reply([1000])
+        return ''
+
+    @staticmethod
+    def _reply(values):
+        return '[ ' + ' '.join(str(value) for value in values) + ' ]'
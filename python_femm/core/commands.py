@@ -0,0 +1,591 @@
+"""Declarative specification of the FEMM preprocessor and postprocessor commands.
+
+Each command is described by its Python name, the FEMM name, its arguments, the
+shape of its return value and the problem types (doctype prefixes) it exists in.
+When the same Python name is given more than once the entries are variants for
+different problem types, e.g. ``add_material`` takes different properties in each.
+
+Arguments are written as ``'name:type'`` separated by spaces, where type is one of:
+
+    n   a number, possibly complex (the default when no type is given);
+    s   a string, ``None`` becomes "<None>";
+    b   a bool, sent as 1 or 0;
+    v   a number or a string (e.g. a magnetisation direction formula);
+    p   a point taken from ``points``, sent as x, y. Each ``points:p`` consumes the next point.
+
+Trailing ``None`` numbers and bools are left out so FEMM uses its defaults, other
+``None`` numbers are sent as 0.
+
+``bind_commands`` adds every command to its API class as a stand in that compiles the
+command into a method the first time it is used, so importing the wrapper stays cheap
+and the per call work is limited to formatting the values given.
+"""
+import time
+from collections import namedtuple
+
+from .profiling import PHASE_CATEGORY, FORMAT_PHASE
+
+ALL_MODES = 'mehc'
+
+# Return shapes.
+SCALAR = 'scalar'
+VECTOR = 'vector'
+
+Command = namedtuple('Command', ['name', 'femm_name', 'args', 'returns', 'modes', 'doc'],
+                     defaults=['', None, ALL_MODES, ''])
+
+PREPROCESSOR_COMMANDS = (
+    # Object Add/Remove Commands
+    Command('add_node', 'addnode', 'points:p', doc='Add a new node at (x, y).'),
+    Command('add_segment', 'addsegment', 'points:p points:p',
+            doc='Add a new line segment from node closest to (x1, y1) to node closest to (x2, y2).'),
+    Command('add_block_label', 'addblocklabel', 'points:p', doc='Add a new block label at (x, y).'),
+    Command('add_arc', 'addarc', 'points:p points:p angle max_seg',
+            doc='Add a new arc segment from the nearest node to (x1, y1) to the nearest node to (x2, y2) with '
+                'angle ``angle`` divided into ``max_seg`` segments.'),
+    Command('delete_selected', 'deleteselected', doc='Delete all selected objects.'),
+    Command('delete_selected_nodes', 'deleteselectednodes', doc='Delete selected nodes.'),
+    Command('delete_selected_labels', 'deleteselectedlabels', doc='Delete selected labels.'),
+    Command('delete_selected_segments', 'deleteselectedsegments', doc='Delete selected segments.'),
+    Command('delete_selected_arc_segments', 'deleteselectedarcsegments', doc='Delete selected arc segments.'),
+
+    # Geometry Selection Commands
+    Command('clear_selected', 'clearselected', doc='Clear all selected nodes, blocks, segments and arc segments.'),
+    Command('select_segment', 'selectsegment', 'points:p', doc='Select the line segment closest to (x, y).'),
+    Command('select_node', 'selectnode', 'points:p', VECTOR,
+            doc='Select the node closest to (x, y). Returns the coordinates of the selected node.'),
+    Command('select_label', 'selectlabel', 'points:p', VECTOR,
+            doc='Select the label closest to (x, y). Returns the coordinates of the selected label.'),
+    Command('select_arc_segment', 'selectarcsegment', 'points:p', doc='Select the arc segment closest to (x, y).'),
+    Command('select_group', 'selectgroup', 'group',
+            doc='Select the nth group of nodes, segments, arc segments and block labels. This function will '
+                'clear all previously selected elements and leave the edit mode in 4 (group).'),
+    Command('select_circle', 'selectcircle', 'points:p radius edit_mode',
+            doc='Select objects within a circle of radius ``radius`` centred at (x, y).'),
+    Command('select_rectangle', 'selectrectangle', 'points:p points:p edit_mode',
+            doc='Select objects within a rectangle defined by points (x1, y1) and (x2, y2).'),
+
+    # Object Labeling Commands
+    Command('set_node_prop', 'setnodeprop', 'prop_name:s group', modes='m',
+            doc='Set the selected nodes to have the nodal property ``prop_name`` and group ``group``.'),
+    Command('set_node_prop', 'setnodeprop', 'prop_name:s group in_conductor:s', modes='ehc',
+            doc='Set the selected nodes to have the nodal property ``prop_name``, group ``group`` and to be '
+                'part of the conductor ``in_conductor``.'),
+    Command('set_block_prop', 'setblockprop',
+            'block_name:s auto_mesh:b mesh_size in_circuit:s mag_direction:v group turns', modes='m',
+            doc='''Set the selected block labels to have the properties:
+
+            – Block property ``block_name``;
+            – ``auto_mesh``: ``False`` = mesher defers to mesh size constraint defined in ``mesh_size``,
+              ``True`` = mesher automatically chooses the mesh density;
+            – ``mesh_size``: size constraint on the mesh in the block marked by this label;
+            – Block is a member of the circuit named ``in_circuit``;
+            – The magnetization is directed along an angle in measured in degrees denoted by the
+              parameter ``mag_direction``. Alternatively, ``mag_direction`` can be a string containing a
+              formula that prescribes the magnetization direction as a function of element position.
+              In this formula theta and R denotes the angle in degrees of a line connecting the center
+              each element with the origin and the length of this line, respectively; x and y denote
+              the x- and y-position of the center of the each element. For axisymmetric problems, r
+              and z should be used in place of x and y;
+            – A member of group number group;
+            – The number of turns associated with this label is denoted by turns.'''),
+    Command('set_block_prop', 'setblockprop', 'block_name:s auto_mesh:b mesh_size group', modes='ehc',
+            doc='Set the selected block labels to have the block property ``block_name``, automatic meshing '
+                '``auto_mesh`` or the mesh size ``mesh_size`` and group ``group``.'),
+    Command('set_segment_prop', 'setsegmentprop', 'prop_name:s element_size auto_mesh:b hide:b group', modes='m',
+            doc='''Set the select segments to have:
+
+            – Boundary property ``prop_name``;
+            – Local element size along segment no greater than ``element_size``;
+            – ``auto_mesh``: ``False`` = mesher defers to the element constraint defined by element_size,
+              ``True`` = mesher automatically chooses mesh size along the selected segments;
+            – ``hide``: ``False`` = not hidden in post-processor, ``True`` = hidden in post-processor;
+            – A member of group number group.'''),
+    Command('set_segment_prop', 'setsegmentprop', 'prop_name:s element_size auto_mesh:b hide:b group in_conductor:s',
+            modes='ehc',
+            doc='Set the selected segments to have the boundary property ``prop_name``, element size '
+                '``element_size`` or automatic meshing ``auto_mesh``, visibility ``hide``, group ``group`` and '
+                'to be part of the conductor ``in_conductor``.'),
+    Command('set_arc_segment_prop', 'setarcsegmentprop', 'max_seg_deg prop_name:s hide:b group', modes='m',
+            doc='Set the selected arc segments to be meshed with elements spanning at most ``max_seg_deg`` '
+                'degrees, to have the boundary property ``prop_name``, visibility ``hide`` and group ``group``.'),
+    Command('set_arc_segment_prop', 'setarcsegmentprop', 'max_seg_deg prop_name:s hide:b group in_conductor:s',
+            modes='ehc',
+            doc='Set the selected arc segments to be meshed with elements spanning at most ``max_seg_deg`` '
+                'degrees, to have the boundary property ``prop_name``, visibility ``hide``, group ``group`` and '
+                'to be part of the conductor ``in_conductor``.'),
+    Command('set_group', 'setgroup', 'group', doc='Set the group associated of the selected items to ``group``.'),
+
+    # Problem Commands
+    Command('problem_definition', 'probdef',
+            'frequency units:s problem_type:s precision depth minimum_angle ac_solver', modes='m',
+            doc='Changes the problem definition. ``frequency`` is in Hertz, ``units`` is one of "inches", '
+                '"millimeters", "centimeters", "mils", "meters" or "micrometers", ``problem_type`` is "planar" '
+                'or "axi", ``precision`` is the RMS residual required by the solver, ``depth`` is the depth of '
+                'planar problems, ``minimum_angle`` is the mesher angle constraint and ``ac_solver`` selects '
+                'the solver used for AC problems.'),
+    Command('problem_definition', 'probdef', 'units:s problem_type:s precision depth minimum_angle', modes='e',
+            doc='Changes the problem definition, see the magnetics variant for the meaning of the arguments.'),
+    Command('problem_definition', 'probdef',
+            'units:s problem_type:s precision depth minimum_angle previous_solution:s time_step', modes='h',
+            doc='Changes the problem definition. ``previous_solution`` and ``time_step`` define a transient '
+                'step from a previous solution.'),
+    Command('problem_definition', 'probdef', 'units:s problem_type:s frequency precision depth minimum_angle',
+            modes='c',
+            doc='Changes the problem definition, see the magnetics variant for the meaning of the arguments.'),
+    Command('analyze', 'analyze', 'minimized:b',
+            doc='Runs the solver. ``minimized`` determines whether or not to minimise the solver window.'),
+    Command('load_solution', 'loadsolution',
+            doc='Loads and displays the solution corresponding to the current geometry.'),
+    Command('set_focus', 'setfocus', 'document_name:s',
+            doc='Switches the input file upon which commands act to the open document ``document_name``.'),
+    Command('save_as', 'saveas', 'filename:s', doc='Saves the file with name ``filename``.'),
+    Command('set_previous', 'setprevious', 'filename:s previous_type', modes='m',
+            doc='Defines the previous solution used for incremental permeability or frozen permeability problems.'),
+    Command('close', 'close', doc='Closes the current preprocessor document and destroys its window.'),
+
+    # Mesh Commands
+    Command('create_mesh', 'createmesh', returns=SCALAR,
+            doc='Runs triangle to create a mesh. Note that this is not a necessary precursor of performing an '
+                'analysis, as ``analyze`` will make sure the mesh is up to date before running an analysis. '
+                'Returns the number of elements in the mesh.'),
+    Command('show_mesh', 'showmesh', doc='Shows the mesh.'),
+    Command('purge_mesh', 'purgemesh', doc='Clears the mesh out of both the screen and memory.'),
+
+    # Editing Commands
+    Command('copy_rotate', 'copyrotate', 'points:p angle copies edit_mode',
+            doc='Copy the selected objects and rotate the copies by ``angle`` degrees about (x, y), ``copies`` '
+                'times.'),
+    Command('copy_translate', 'copytranslate', 'dx dy copies edit_mode',
+            doc='Copy the selected objects and translate each copy by (dx, dy), ``copies`` times.'),
+    Command('create_radius', 'createradius', 'points:p radius',
+            doc='Turns the corner at the node closest to (x, y) into a curve of radius ``radius``.'),
+    Command('mirror', 'mirror', 'points:p points:p edit_mode',
+            doc='Mirror the selected objects about the line through (x1, y1) and (x2, y2).'),
+    Command('move_rotate', 'moverotate', 'points:p angle edit_mode',
+            doc='Rotate the selected objects about (x, y) by ``angle`` degrees.'),
+    Command('move_translate', 'movetranslate', 'dx dy edit_mode', doc='Translate the selected objects by (dx, dy).'),
+    Command('scale', 'scale', 'points:p scale_factor edit_mode',
+            doc='Scale the selected objects by ``scale_factor`` about (x, y).'),
+    Command('set_edit_mode', 'seteditmode', 'edit_mode:s',
+            doc='Sets the current edit mode to "nodes", "segments", "arcsegments", "blocks" or "group".'),
+
+    # Zoom Commands
+    Command('zoom_natural', 'zoomnatural', doc='Zooms to a “natural” view with sensible extents.'),
+    Command('zoom_out', 'zoomout', doc='Zoom out by a factor of 50%.'),
+    Command('zoom_in', 'zoomin', doc='Zoom in by a factor of 200%.'),
+    Command('zoom', 'zoom', 'x1 y1 x2 y2',
+            doc='Set the display area to be from the bottom left corner specified by (x1, y1) to the top right '
+                'corner specified by (x2, y2).'),
+
+    # View Commands
+    Command('show_names', 'shownames', 'show:b', doc='Show or hide the material names in the preprocessor.'),
+    Command('show_grid', 'showgrid', doc='Show the grid points.'),
+    Command('hide_grid', 'hidegrid', doc='Hide the grid points.'),
+    Command('grid_snap', 'gridsnap', 'flag:s', doc='Turn snap to grid "on" or "off".'),
+    Command('set_grid', 'setgrid', 'density grid_type:s',
+            doc='Change the grid spacing to ``density`` with ``grid_type`` either "cart" or "polar".'),
+    Command('refresh_view', 'refreshview', doc='Redraw the current view.'),
+    Command('minimize', 'minimize', doc='Minimise the active window.'),
+    Command('maximize', 'maximize', doc='Maximise the active window.'),
+    Command('restore', 'restore', doc='Restore the active window from a minimised or maximised state.'),
+    Command('resize', 'resize', 'width height', doc='Resize the active window client area to width by height.'),
+    Command('save_bitmap', 'savebitmap', 'filename:s', doc='Saves a bitmap of the current view to ``filename``.'),
+    Command('save_metafile', 'savemetafile', 'filename:s',
+            doc='Saves a metafile of the current view to ``filename``.'),
+    Command('read_dxf', 'readdxf', 'filename:s', doc='Imports the dxf file ``filename``.'),
+    Command('save_dxf', 'savedxf', 'filename:s', doc='Saves the geometry as the dxf file ``filename``.'),
+
+    # Object Properties
+    Command('get_material', 'getmaterial', 'material_name:s',
+            doc='Fetches the material specified by ``material_name`` from materials library.'),
+    Command('add_material', 'addmaterial',
+            'material_name:s mu_x mu_y h_c j c_duct lam_d phi_hmax lam_fill lam_type phi_hx phi_hy '
+            'number_of_strands wire_diameter', modes='m',
+            doc='Adds a new material called ``material_name`` with the given properties.'),
+    Command('add_material', 'addmaterial', 'material_name:s e_x e_y q_v', modes='e',
+            doc='Adds a new material called ``material_name`` with the given properties.'),
+    Command('add_material', 'addmaterial', 'material_name:s k_x k_y q_v k_t', modes='h',
+            doc='Adds a new material called ``material_name`` with the given properties.'),
+    Command('add_material', 'addmaterial', 'material_name:s o_x o_y e_x e_y lt_x lt_y', modes='c',
+            doc='Adds a new material called ``material_name`` with the given properties.'),
+    Command('add_bh_point', 'addbhpoint', 'material_name:s b h', modes='m',
+            doc='Adds a B-H data point to the material called ``material_name``.'),
+    Command('clear_bh_points', 'clearbhpoints', 'material_name:s', modes='m',
+            doc='Clears all B-H data points associated with the material called ``material_name``.'),
+    Command('add_tk_point', 'addtkpoint', 'material_name:s temperature conductivity', modes='h',
+            doc='Adds a thermal conductivity versus temperature point to the material ``material_name``.'),
+    Command('clear_tk_points', 'cleartkpoints', 'material_name:s', modes='h',
+            doc='Clears all conductivity versus temperature points of the material ``material_name``.'),
+    Command('add_point_prop', 'addpointprop', 'point_name:s a j', modes='m',
+            doc='Adds a new point property with a prescribed vector potential ``a`` and point current ``j``.'),
+    Command('add_point_prop', 'addpointprop', 'point_name:s v_p q_p', modes='e',
+            doc='Adds a new point property with a prescribed voltage ``v_p`` and point charge density ``q_p``.'),
+    Command('add_point_prop', 'addpointprop', 'point_name:s t_p q_p', modes='h',
+            doc='Adds a new point property with a prescribed temperature ``t_p`` and point heat generation '
+                '``q_p``.'),
+    Command('add_point_prop', 'addpointprop', 'point_name:s v_p j_p', modes='c',
+            doc='Adds a new point property with a prescribed voltage ``v_p`` and point current density ``j_p``.'),
+    Command('add_boundary_prop', 'addboundprop',
+            'prop_name:s a_0 a_1 a_2 phi mu sig c_0 c_1 boundary_format inner_angle outer_angle', modes='m',
+            doc='Adds a new boundary property called ``prop_name``. ``c_0`` and ``c_1`` may be complex.'),
+    Command('add_boundary_prop', 'addboundprop', 'prop_name:s v_s q_s c_0 c_1 boundary_format', modes='e',
+            doc='Adds a new boundary property called ``prop_name``.'),
+    Command('add_boundary_prop', 'addboundprop', 'prop_name:s boundary_format t_set q_s t_inf h beta', modes='h',
+            doc='Adds a new boundary property called ``prop_name``.'),
+    Command('add_boundary_prop', 'addboundprop', 'prop_name:s v_s j_s c_0 c_1 boundary_format', modes='c',
+            doc='Adds a new boundary property called ``prop_name``.'),
+    Command('add_circuit_prop', 'addcircprop', 'circuit_name:s current circuit_type', modes='m',
+            doc='Adds a new circuit property with name ``circuit_name`` with a prescribed current. The '
+                '``circuit_type`` parameter is 0 for a parallel-connected circuit and 1 for a series-connected '
+                'circuit.'),
+    Command('add_conductor_prop', 'addconductorprop', 'conductor_name:s v_c q_c conductor_type', modes='e',
+            doc='Adds a new conductor with a prescribed voltage ``v_c`` or total charge ``q_c``.'),
+    Command('add_conductor_prop', 'addconductorprop', 'conductor_name:s t_c q_c conductor_type', modes='h',
+            doc='Adds a new conductor with a prescribed temperature ``t_c`` or total heat flux ``q_c``.'),
+    Command('add_conductor_prop', 'addconductorprop', 'conductor_name:s v_c j_c conductor_type', modes='c',
+            doc='Adds a new conductor with a prescribed voltage ``v_c`` or total current ``j_c``.'),
+    Command('delete_material', 'deletematerial', 'material_name:s',
+            doc='Deletes the material called ``material_name``.'),
+    Command('delete_boundary_prop', 'deleteboundprop', 'prop_name:s',
+            doc='Deletes the boundary property called ``prop_name``.'),
+    Command('delete_point_prop', 'deletepointprop', 'point_name:s',
+            doc='Deletes the point property called ``point_name``.'),
+    Command('delete_circuit', 'deletecircuit', 'circuit_name:s', modes='m',
+            doc='Deletes the circuit called ``circuit_name``.'),
+    Command('delete_conductor', 'deleteconductor', 'conductor_name:s', modes='ehc',
+            doc='Deletes the conductor called ``conductor_name``.'),
+    Command('modify_material', 'modifymaterial', 'material_name:s prop_number value:v',
+            doc='Sets the property number ``prop_number`` of the material ``material_name`` to ``value``.'),
+    Command('modify_boundary_prop', 'modifyboundprop', 'prop_name:s prop_number value:v',
+            doc='Sets the property number ``prop_number`` of the boundary property ``prop_name`` to ``value``.'),
+    Command('modify_point_prop', 'modifypointprop', 'point_name:s prop_number value:v',
+            doc='This function allows for modification of a point property. The point property to be modified '
+                'is specified by ``point_name``. The next parameter is the number of the property to be set. '
+                'The last number is the value to be applied to the specified property.'),
+    Command('modify_circuit_prop', 'modifycircprop', 'circuit_name:s prop_number value:v', modes='m',
+            doc='This function allows for modification of a circuit property. The circuit property to be '
+                'modified is specified by ``circuit_name``. The next parameter is the number of the property to '
+                'be set. The last number is the value to be applied to the specified property. The various '
+                'properties that can be modified are listed below: 0: CircName, 1: i or 2: CircType.'),
+    Command('modify_conductor_prop', 'modifyconductorprop', 'conductor_name:s prop_number value:v', modes='ehc',
+            doc='Sets the property number ``prop_number`` of the conductor ``conductor_name`` to ``value``.'),
+    Command('set_current', 'setcurrent', 'circuit_name:s current', modes='m',
+            doc='Sets the current of the circuit ``circuit_name`` to ``current``.'),
+
+    # Miscellaneous
+    Command('make_abc', 'makeABC', 'number_of_shells radius points:p boundary_condition_type',
+            doc='Creates a series of circular shells that emulate the impedance of an unbounded domain.'),
+    Command('define_outer_space', 'defineouterspace', 'z_o r_o r_i',
+            doc='Defines an axisymmetric external region to be used in conjunction with the Kelvin '
+                'Transformation method of modelling unbounded problems.'),
+    Command('attach_outer_space', 'attachouterspace',
+            doc='Marks all selected block labels as members of the external region.'),
+    Command('detach_outer_space', 'detachouterspace',
+            doc='Undefines all selected block labels as members of the external region.'),
+    Command('attach_default', 'attachdefault', doc='Marks the selected block label as the default block label.'),
+    Command('detach_default', 'detachdefault', doc='Undefines the default attribute for the selected block labels.'),
+)
+
+POSTPROCESSOR_COMMANDS = (
+    # Data Extraction Commands
+    Command('line_integral', 'lineintegral', 'integral_type', VECTOR,
+            doc='Calculate the line integral for the defined contour. Returns typically two (possibly complex) '
+                'values as results.'),
+    Command('block_integral', 'blockintegral', 'integral_type', SCALAR,
+            doc='Calculate a block integral for the selected blocks. This function returns one (possibly '
+                'complex) value.'),
+    Command('get_point_values', 'getpointvalues', 'x y', VECTOR,
+            doc='Get the values associated with the point at (x, y), returned in the order listed in the FEMM '
+                'manual for the current problem type.'),
+    Command('get_circuit_properties', 'getcircuitproperties', 'circuit_name:s', VECTOR, modes='m',
+            doc='Returns the current, voltage drop and flux linkage of the circuit ``circuit_name``.'),
+    Command('get_conductor_properties', 'getconductorproperties', 'conductor_name:s', VECTOR, modes='ehc',
+            doc='Returns the properties (e.g. voltage and charge) of the conductor ``conductor_name``.'),
+    Command('get_problem_info', 'getprobleminfo', returns=VECTOR,
+            doc='Returns the problem type, frequency, depth and length unit of the problem.'),
+    Command('num_nodes', 'numnodes', returns=SCALAR, doc='Returns the number of nodes in the mesh.'),
+    Command('num_elements', 'numelements', returns=SCALAR, doc='Returns the number of elements in the mesh.'),
+    Command('get_node', 'getnode', 'n', VECTOR, doc='Returns the (x, y) or (r, z) position of the nth mesh node.'),
+    Command('get_element', 'getelement', 'n', VECTOR,
+            doc='Returns the node numbers, centroid, area and group number of the nth mesh element.'),
+    Command('get_a', 'geta', 'x y', SCALAR, modes='m', doc='Returns the vector potential at (x, y).'),
+    Command('get_b', 'getb', 'x y', VECTOR, modes='m', doc='Returns the flux density at (x, y).'),
+    Command('get_h', 'geth', 'x y', VECTOR, modes='m', doc='Returns the field intensity at (x, y).'),
+    Command('get_j', 'getj', 'x y', SCALAR, modes='m', doc='Returns the current density at (x, y).'),
+    Command('get_j', 'getj', 'x y', VECTOR, modes='c', doc='Returns the current density at (x, y).'),
+    Command('get_mu', 'getmu', 'x y', VECTOR, modes='m', doc='Returns the relative permeability at (x, y).'),
+    Command('get_pe', 'getpe', 'x y', SCALAR, modes='m', doc='Returns the eddy current loss density at (x, y).'),
+    Command('get_ph', 'getph', 'x y', SCALAR, modes='m', doc='Returns the hysteresis loss density at (x, y).'),
+    Command('get_fill', 'getfill', 'x y', SCALAR, modes='m', doc='Returns the winding fill factor at (x, y).'),
+    Command('get_conductivity', 'getconductivity', 'x y', SCALAR, modes='m',
+            doc='Returns the electrical conductivity at (x, y).'),
+    Command('get_energy_density', 'getenergydensity', 'x y', SCALAR, modes='m',
+            doc='Returns the magnetic field energy density at (x, y).'),
+    Command('get_v', 'getv', 'x y', SCALAR, modes='ec', doc='Returns the voltage at (x, y).'),
+    Command('get_d', 'getd', 'x y', VECTOR, modes='e', doc='Returns the electric flux density at (x, y).'),
+    Command('get_e', 'gete', 'x y', VECTOR, modes='ec', doc='Returns the electric field intensity at (x, y).'),
+    Command('get_t', 'gett', 'x y', SCALAR, modes='h', doc='Returns the temperature at (x, y).'),
+    Command('get_f', 'getf', 'x y', VECTOR, modes='h', doc='Returns the heat flux density at (x, y).'),
+    Command('get_g', 'getg', 'x y', VECTOR, modes='h', doc='Returns the temperature gradient at (x, y).'),
+    Command('get_k', 'getk', 'x y', VECTOR, modes='hc',
+            doc='Returns the thermal conductivity (heat flow) or the AC conductivity (current flow) at (x, y).'),
+
+    # Selection Commands
+    Command('set_edit_mode', 'seteditmode', 'mode:s',
+            doc='Sets the mode of the postprocessor to point, contour, or area mode. Valid entries for mode are '
+                '"point", "contour", and "area".'),
+    Command('select_block', 'selectblock', 'points:p', doc='Select the block that contains point (x, y).'),
+    Command('group_select_block', 'groupselectblock', 'group',
+            doc='Selects all of the blocks that are labeled by block labels that are members of group n. If no '
+                'number is specified all blocks are selected.'),
+    Command('add_contour', 'addcontour', 'points:p', doc='Adds a contour point at (x, y).'),
+    Command('bend_contour', 'bendcontour', 'angle angle_step',
+            doc='Replaces the straight line formed by the last two points in the contour by an arc that spans '
+                '``angle`` degrees, discretised in steps of ``angle_step`` degrees.'),
+    Command('select_point', 'selectpoint', 'points:p',
+            doc='Adds a contour point at the closest input point to (x, y).'),
+    Command('clear_contour', 'clearcontour', doc='Clear a previously defined contour.'),
+    Command('clear_block', 'clearblock', doc='Clear block selection.'),
+
+    # View Commands
+    Command('show_density_plot', 'showdensityplot', 'legend grey_scale:b upper_bound lower_bound plot_type:s',
+            modes='m',
+            doc='''Shows the flux density plot with options:
+            – ``legend`` Set to 0 to hide the plot legend or 1 to show the plot legend.
+            – ``grey_scale`` Set to 0 for a colour density plot or 1 for a grey scale density plot.
+            – ``upper_bound`` Sets the upper display limit for the density plot.
+            – ``lower_bound`` Sets the lower display limit for the density plot.
+            – ``plot_type`` Type of density plot to display. Valid entries are "bmag", "breal", and "bimag"
+                for magnitude, real component, and imaginary component of flux density (B), respectively;
+                "hmag", "hreal", and "himag" for magnitude, real component, and imaginary
+                component of field intensity (H); and "jmag", "jreal", and "jimag" for magnitude,
+                real component, and imaginary component of current density (J).
+
+        If legend is set to -1 all parameters are ignored and default values are used.'''),
+    Command('show_density_plot', 'showdensityplot', 'legend grey_scale:b plot_type:s upper_bound lower_bound',
+            modes='ehc', doc='Shows the density plot, see the magnetics variant for the meaning of the arguments.'),
+    Command('hide_density_plot', 'hidedensityplot', doc='Hides the density plot.'),
+    Command('show_contour_plot', 'showcontourplot', 'contour_count lower_bound upper_bound plot_type:s',
+            modes='mc', doc='Shows ``contour_count`` contours between ``lower_bound`` and ``upper_bound``.'),
+    Command('show_contour_plot', 'showcontourplot', 'contour_count lower_bound upper_bound', modes='eh',
+            doc='Shows ``contour_count`` contours between ``lower_bound`` and ``upper_bound``.'),
+    Command('hide_contour_plot', 'hidecontourplot', doc='Hides the contour plot.'),
+    Command('show_vector_plot', 'showvectorplot', 'plot_type scale_factor',
+            doc='Shows a vector plot of type ``plot_type`` scaled by ``scale_factor``.'),
+    Command('show_mesh', 'showmesh', doc='Shows the mesh.'),
+    Command('hide_mesh', 'hidemesh', doc='Hides the mesh.'),
+    Command('show_points', 'showpoints', doc='Shows the input points.'),
+    Command('hide_points', 'hidepoints', doc='Hides the input points.'),
+    Command('smooth', 'smooth', 'flag:s', doc='Turn smoothing of the derived fields "on" or "off".'),
+    Command('show_grid', 'showgrid', doc='Show the grid points.'),
+    Command('hide_grid', 'hidegrid', doc='Hide the grid points.'),
+    Command('grid_snap', 'gridsnap', 'flag:s', doc='Turn snap to grid "on" or "off".'),
+    Command('set_grid', 'setgrid', 'density grid_type:s',
+            doc='Change the grid spacing to ``density`` with ``grid_type`` either "cart" or "polar".'),
+    Command('zoom_natural', 'zoomnatural', doc='Zooms to a “natural” view with sensible extents.'),
+    Command('zoom_out', 'zoomout', doc='Zoom out by a factor of 50%.'),
+    Command('zoom_in', 'zoomin', doc='Zoom in by a factor of 200%.'),
+    Command('zoom', 'zoom', 'x1 y1 x2 y2',
+            doc='Set the display area to be from the bottom left corner specified by (x1, y1) to the top right '
+                'corner specified by (x2, y2).'),
+    Command('refresh_view', 'refreshview', doc='Redraw the current view.'),
+    Command('minimize', 'minimize', doc='Minimise the active window.'),
+    Command('maximize', 'maximize', doc='Maximise the active window.'),
+    Command('restore', 'restore', doc='Restore the active window from a minimised or maximised state.'),
+    Command('resize', 'resize', 'width height', doc='Resize the active window client area to width by height.'),
+    Command('save_bitmap', 'savebitmap', 'filename:s', doc='Saves a bitmap of the current view to ``filename``.'),
+    Command('save_metafile', 'savemetafile', 'filename:s',
+            doc='Saves a metafile of the current view to ``filename``.'),
+
+    # Miscellaneous
+    Command('reload', 'reload', doc='Reloads the solution from disk.'),
+    Command('close', 'close', doc='Closes the current postprocessor document and window.'),
+)
+
+
+def _number(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, complex):
+        # FEMM's Lua writes complex numbers with its imaginary unit ``I``.
+        return f'{value.real!r}{"-" if value.imag < 0 else "+"}I*{abs(value.imag)!r}'
+    return str(value)
+
+
+def _string(value):
+    if value is None:
+        return '"<None>"'
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _bool(value):
+    if value is None:
+        return None
+    return '1' if value else '0'
+
+
+def _value(value):
+    if isinstance(value, str):
+        return _string(value)
+    return _number(value)
+
+
+def _join(parts):
+    """Join formatted arguments, leaving out trailing ``None`` parts and sending the others as 0."""
+
+    if None not in parts:
+        return ', '.join(parts)
+    end = len(parts)
+    while end and parts[end - 1] is None:
+        end -= 1
+    return ', '.join(['0' if part is None else part for part in parts[:end]])
+
+
+def _vector(res):
+    return res if isinstance(res, list) else [res]
+
+
+def _unsupported(name, prefix):
+    if prefix is None:
+        raise ValueError(f'``{name}`` needs an open document, call ``new_document`` or ``open_document`` first.')
+    raise ValueError(f'``{name}`` is not available for {PREFIX_NAMES[prefix]} problems.')
+
+
+PREFIX_NAMES = {
+    'm': 'magnetics',
+    'e': 'electrostatics',
+    'h': 'heat flow',
+    'c': 'current flow',
+}
+
+FORMATTERS = {
+    'n': '_number',
+    's': '_string',
+    'b': '_bool',
+    'v': '_value',
+}
+
+NAMESPACE = {
+    '_number': _number,
+    '_string': _string,
+    '_bool': _bool,
+    '_value': _value,
+    '_join': _join,
+    '_vector': _vector,
+    '_unsupported': _unsupported,
+    '_perf_counter': time.perf_counter,
+    '_PHASE_CATEGORY': PHASE_CATEGORY,
+    '_FORMAT_PHASE': FORMAT_PHASE,
+}
+
+
+def _parse_arg_spec(args):
+    """Split an argument spec such as ``'points:p angle max_seg'`` into (name, type) pairs."""
+
+    parsed = []
+    for arg in args.split():
+        name, _, arg_type = arg.partition(':')
+        parsed.append((name, arg_type or 'n'))
+    return parsed
+
+
+def _format_expressions(args):
+    expressions = []
+    point_index = 0
+    for name, arg_type in args:
+        if arg_type == 'p':
+            expressions.append(f'_number({name}[{point_index}][0])')
+            expressions.append(f'_number({name}[{point_index}][1])')
+            point_index += 1
+        else:
+            expressions.append(f'{FORMATTERS[arg_type]}({name})')
+    return expressions
+
+
+def compile_command(api_prefix, name, variants):
+    """Generate the source of a method calling the command ``name`` in each of its
+    variants and compile it. The call string of each variant is built with a single
+    concatenation of precomputed heads and per argument formatters."""
+
+    namespace = dict(NAMESPACE)
+    params = []
+    for variant in variants:
+        for arg_name, _ in _parse_arg_spec(variant.args):
+            if arg_name not in params:
+                params.append(arg_name)
+    signature = ''.join(f', {param}=None' for param in params)
+    lines = [f'def {name}(self{signature}):', '    session = self.session', '    prefix = session.doctype_prefix']
+    for index, variant in enumerate(variants):
+        namespace[f'_heads_{index}'] = {mode: f'{mode}{api_prefix}_{variant.femm_name}(' for mode in variant.modes}
+        expressions = _format_expressions(_parse_arg_spec(variant.args))
+        if expressions:
+            string = f'_heads_{index}[prefix] + _join(({", ".join(expressions)},)) + ")"'
+        else:
+            string = f'_heads_{index}[prefix] + ")"'
+        call = 'session.call_femm(string)'
+        lines.append(f'    {"if" if index == 0 else "elif"} prefix in _heads_{index}:')
+        # Formatting the arguments is timed as its own phase when the session is profiled.
+        lines.append('        if session.profiler is None:')
+        lines.append(f'            string = {string}')
+        lines.append('        else:')
+        lines.append('            start = _perf_counter()')
+        lines.append(f'            string = {string}')
+        lines.append('            session.profiler.record(_PHASE_CATEGORY, _FORMAT_PHASE, _perf_counter() - start)')
+        if variant.returns == VECTOR:
+            lines.append(f'        return _vector({call})')
+        elif variant.returns == SCALAR:
+            lines.append(f'        return {call}')
+        else:
+            lines.append(f'        {call}')
+    lines.append('    else:')
+    lines.append(f'        _unsupported({name!r}, prefix)')
+    exec('\n'.join(lines), namespace)
+    method = namespace[name]
+    method.__doc__ = next((variant.doc for variant in variants if variant.doc), None)
+    return method
+
+
+class _LazyCommand:
+    """Stands in for a command method until it is first used, then compiles it and
+    replaces itself, so importing the wrapper doesn't compile every FEMM command."""
+
+    def __init__(self, api_class, name, variants):
+        self.api_class = api_class
+        self.name = name
+        self.variants = variants
+
+    def compile(self):
+        method = compile_command(self.api_class.mode_prefix, self.name, self.variants)
+        method.__qualname__ = f'{self.api_class.__name__}.{self.name}'
+        for variant in self.variants:
+            self.api_class.commands[variant.femm_name] = method
+        if vars(self.api_class).get(self.name) is self:
+            setattr(self.api_class, self.name, method)
+        return method
+
+    def __get__(self, instance, owner=None):
+        method = self.compile()
+        return method if instance is None else method.__get__(instance, owner)
+
+    def __call__(self, *args, **kwargs):
+        return self.compile()(*args, **kwargs)
+
+
+def bind_commands(api_class, commands):
+    """Add ``commands`` as methods of ``api_class``, compiled on first use. Methods defined
+    on the class itself take precedence, these can reach the generated methods through
+    ``api_class.commands`` (keyed by FEMM name), see ``BaseAPI._run``."""
+
+    variants = {}
+    for command in commands:
+        variants.setdefault(command.name, []).append(command)
+    api_class.commands = {}
+    for name, command_variants in variants.items():
+        method = _LazyCommand(api_class, name, command_variants)
+        for variant in command_variants:
+            api_class.commands[variant.femm_name] = method
+        if name not in vars(api_class):
+            setattr(api_class, name, method)
@@ -0,0 +1,76 @@
+import json
+import os
+
+import numpy as np
+
+COSTS_DIRECTORY = os.path.join('.python_femm', 'costs')
+
+# Number of recorded points needed before a quadratic cost model is fitted over the grid.
+MINIMUM_FIT_SAMPLES = 6
+
+
+class CostModel:
+    """Estimates how long each point of a scene will take from the durations recorded in
+    previous runs, so the runner can submit the longest points first and they don't end
+    up holding the pool at the end of the run.
+
+    Points recorded for the same number of iterations use their last duration, other points
+    use a quadratic fitted over the normalised grid position (or the nearest recorded point
+    when there are too few). With no history, points further from the centre of the grid
+    are assumed to be slower, as the corners of a sweep tend to be the extreme designs."""
+
+    def __init__(self, path):
+        self.path = path
+        self.durations = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.durations = {tuple(entry['point']): entry['seconds'] for entry in json.load(f)}
+
+    @classmethod
+    def for_scene(cls, scene, directory=COSTS_DIRECTORY):
+        return cls(os.path.join(directory, f'{type(scene).__name__}.json'))
+
+    def record(self, iterations, point, seconds):
+        self.durations[(iterations, *point)] = seconds
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump([{'point': list(key), 'seconds': seconds} for key, seconds in self.durations.items()], f)
+
+    @staticmethod
+    def _normalise(iterations, points):
+        return np.asarray(points, dtype=float).reshape(-1, 2) / max(iterations - 1, 1)
+
+    def estimate(self, iterations, points):
+        """Return the estimated duration of every ``(x_iteration, y_iteration)`` in ``points``."""
+
+        positions = self._normalise(iterations, points)
+        if not self.durations:
+            # Distance from the centre of the grid, the unit doesn't matter for ordering.
+            return np.linalg.norm(positions - 0.5, axis=1)
+
+        keys = list(self.durations)
+        recorded = np.array([self.durations[key] for key in keys])
+        recorded_positions = np.array([np.asarray(key[1:], dtype=float) / max(key[0] - 1, 1) for key in keys])
+        if len(keys) >= MINIMUM_FIT_SAMPLES:
+            coefficients, *_ = np.linalg.lstsq(_quadratic_features(recorded_positions), recorded, rcond=None)
+            estimates = _quadratic_features(positions) @ coefficients
+        else:
+            distances = np.linalg.norm(positions[:, None, :] - recorded_positions[None, :, :], axis=2)
+            estimates = recorded[distances.argmin(axis=1)]
+        for index, point in enumerate(points):
+            known = self.durations.get((iterations, *point))
+            if known is not None:
+                estimates[index] = known
+        return estimates
+
+    def order(self, iterations, points):
+        """Return the indices of ``points`` ordered by descending estimated duration."""
+
+        return [int(index) for index in np.argsort(-self.estimate(iterations, points), kind='stable')]
+
+
+def _quadratic_features(positions):
+    u, v = positions[:, 0], positions[:, 1]
+    return np.column_stack([np.ones(len(positions)), u, v, u * u, v * v, u * v])
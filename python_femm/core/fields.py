@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+
+
+class RectangularGrid:
+    """A regular grid of ``x_count`` by ``y_count`` points spanning the given ranges."""
+
+    def __init__(self, x_start=None, x_end=None, x_count=None, y_start=None, y_end=None, y_count=None):
+        self.x = np.linspace(x_start, x_end, x_count)
+        self.y = np.linspace(y_start, y_end, y_count)
+
+    @property
+    def shape(self):
+        return len(self.x), len(self.y)
+
+    def points(self):
+        """Return the (x, y) coordinates of every point as an array of shape (n, 2), ordered
+        so that it reshapes to ``shape``."""
+
+        x, y = np.meshgrid(self.x, self.y, indexing='ij')
+        return np.column_stack([x.ravel(), y.ravel()])
+
+
+class PolarGrid:
+    """A polar grid of ``r_count`` radii by ``theta_count`` angles (in degrees) about
+    ``center``, e.g. to sample the air gap of a machine."""
+
+    def __init__(self, center=(0, 0), r_start=None, r_end=None, r_count=None, theta_start=0, theta_end=360,
+                 theta_count=None, endpoint=False):
+        self.center = center
+        self.r = np.linspace(r_start, r_end, r_count)
+        # By default the end angle is left out so a full revolution has no duplicate points.
+        self.theta = np.linspace(theta_start, theta_end, theta_count, endpoint=endpoint)
+
+    @property
+    def shape(self):
+        return len(self.r), len(self.theta)
+
+    def points(self):
+        r, theta = np.meshgrid(self.r, np.radians(self.theta), indexing='ij')
+        x = self.center[0] + r * np.cos(theta)
+        y = self.center[1] + r * np.sin(theta)
+        return np.column_stack([x.ravel(), y.ravel()])
+
+
+class FieldMap:
+    """A lazy handle to a field map stored as a ``.npy`` file. Only the path and the grid
+    are pickled, so it can be returned from ``post`` cheaply and the values are memory-mapped
+    when accessed. The array has the shape ``grid.shape + (number of values,)`` where the
+    values are those of ``get_point_values``, points outside the solution are NaN."""
+
+    def __init__(self, path, grid=None):
+        self.path = path
+        self.grid = grid
+        self._array = None
+
+    @property
+    def array(self):
+        if self._array is None:
+            self._array = np.load(self.path, mmap_mode='r')
+        return self._array
+
+    def __getstate__(self):
+        # The mapping stays behind, the receiver maps the file again when it needs it.
+        state = self.__dict__.copy()
+        state['_array'] = None
+        return state
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    def __getitem__(self, key):
+        return self.array[key]
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.array, dtype=dtype)
+
+    def __repr__(self):
+        return f'FieldMap({self.path!r})'
+
+
+def sample_field_map(get_point_values, grid, path, dtype=None):
+    """Call ``get_point_values`` at every point of ``grid`` and write the values straight
+    into a memory-mapped ``.npy`` file at ``path``. The dtype is float64 unless the values
+    are complex (AC problems) or ``dtype`` is given."""
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    values = None
+    flat = None
+    for index, (x, y) in enumerate(grid.points().tolist()):
+        point_values = get_point_values(x, y)
+        if not point_values:
+            # The point is outside of the solution, its row is NaN.
+            if flat is not None:
+                flat[index] = np.nan
+            continue
+        if values is None:
+            if dtype is None:
+                dtype = np.complex128 if any(isinstance(value, complex) for value in point_values) else np.float64
+            values = np.lib.format.open_memmap(path, mode='w+', dtype=dtype,
+                                               shape=grid.shape + (len(point_values),))
+            flat = values.reshape(-1, len(point_values))
+            flat[:index] = np.nan
+        flat[index] = point_values
+    if values is None:
+        raise ValueError('None of the points of the grid are inside the solution.')
+    values.flush()
+    del flat, values
+    return FieldMap(path, grid)
@@ -4,7 +4,8 @@ import shutil
 import sys
 from pathlib import Path
 
-from .run import hot_reload_pre, run_pre, run_solve, run_post
+from .run import hot_reload_pre, run_pre, run_solve, run_post, run_profile
+from .pool import DEFAULT_START_METHOD
 from .scenes import SceneRunner
 
 
@@ -57,6 +58,10 @@ def run_command(argv, paths=None):
             pre_runner, _ = run_pre(model_class)
             pre_runner = run_solve(pre_runner)
             run_post(pre_runner, hold=True)
+        elif command_name == 'profile':
+            if len(argv) == 2 or argv[2] not in ('pre', 'solve', 'post'):
+                raise ValueError('You must provide a stage to profile. For example ``python manage.py profile solve``.')
+            run_profile(model_class, argv[2])
         elif command_name == 'scene':
             if len(argv) == 2:
                 raise ValueError('You must provide a scene name. For example ``python manage.py scene MyScene``.')
@@ -66,7 +71,13 @@ def run_command(argv, paths=None):
                 # scene_class = getattr(scenes, scene_name)
             except KeyError:
                 raise ValueError(f'No scene matching the name {scene_name}.')
-            SceneRunner().start(scene_class())
+            trace_path = argv[argv.index('--trace') + 1] if '--trace' in argv else None
+            scratch_root = argv[argv.index('--scratch') + 1] if '--scratch' in argv else None
+            timeout = float(argv[argv.index('--timeout') + 1]) if '--timeout' in argv else None
+            retries = int(argv[argv.index('--retries') + 1]) if '--retries' in argv else 0
+            start_method = argv[argv.index('--start-method') + 1] if '--start-method' in argv else DEFAULT_START_METHOD
+            SceneRunner(trace_path=trace_path, scratch_root=scratch_root, timeout=timeout, retries=retries,
+                        speculate='--speculate' in argv, start_method=start_method).start(scene_class())
 
         else:
             raise ValueError('No matching command.')
@@ -1,13 +1,21 @@
+from .postprocessing import ParallelPost
 from .wrapper import FEMMSession
 
 
 class Model:
+    # A backend class (or factory) the session sends commands to, ``None`` for FEMM itself.
+    backend = None
+    # The (x_value, y_value) of the scene point being run, e.g. to name output files.
+    point = None
+    # The directory FEMM reads and writes relative paths in, ``None`` for the current directory.
+    working_directory = None
 
     def __init__(self, session=None):
         self.session = session
 
-    def start(self):
-        self.session = FEMMSession()
+    def start(self, profile=False):
+        backend = self.backend() if self.backend is not None else None
+        self.session = FEMMSession(profile=profile, backend=backend, directory=self.working_directory)
 
     def pre(self):
         raise NotImplementedError('You need to implement this method.')
@@ -18,5 +26,13 @@ class Model:
     def post(self):
         raise NotImplementedError('You need to implement this method.')
 
+    def post_in_parallel(self, solution_path, tasks, processes=None):
+        """Evaluate the post-processing ``tasks`` against the solution ``solution_path`` on
+        several FEMM instances at once and return their results in order, see ``ParallelPost``."""
+
+        with ParallelPost(solution_path, processes=processes, backend=self.backend,
+                          directory=self.working_directory) as post:
+            return post.map(tasks)
+
     def close(self):
         self.session.pre.close()
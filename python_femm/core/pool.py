@@ -0,0 +1,261 @@
+import multiprocessing as mp
+import os
+import signal
+import statistics
+import sys
+import time
+import traceback
+from collections import deque
+from multiprocessing.connection import wait
+
+from . import backends
+
+# Forking the runner, which may have COM or threads running, isn't safe. Workers are forked
+# from a clean fork server where there is one and spawned otherwise (Windows).
+DEFAULT_START_METHOD = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+# Modules imported once by the fork server, so workers forked from it start with them loaded.
+PRELOAD_MODULES = ('numpy', 'python_femm.core.wrapper', 'python_femm.core.scenes')
+
+# A task that has been running this many times longer than the median task is duplicated
+# onto an idle worker near the end of a run, the first copy to finish wins.
+SPECULATION_FACTOR = 1.5
+# Number of finished tasks needed before a median is trusted for speculation.
+SPECULATION_MINIMUM_SAMPLES = 3
+# How often the pool checks for stragglers when speculating, in seconds.
+SPECULATION_INTERVAL = 0.5
+
+
+def get_context(start_method=DEFAULT_START_METHOD, preload=PRELOAD_MODULES):
+    """Return the multiprocessing context to start workers with, the fork server imports
+    the modules in ``preload`` before forking any worker."""
+
+    context = mp.get_context(start_method)
+    if context.get_start_method() == 'forkserver':
+        context.set_forkserver_preload(list(preload))
+    elif sys.platform == 'win32':
+        import _winapi
+
+        # Spawn the Python executable itself rather than a launcher or embedding application.
+        context.set_executable(_winapi.GetModuleFileName(0))
+    return context
+
+
+class TaskFailure:
+    """The outcome of a task that failed on every attempt. ``seconds`` is the longest an
+    attempt ran before it failed, a lower bound on how long the task takes."""
+
+    def __init__(self, reason, attempts, seconds=0.0):
+        self.reason = reason
+        self.attempts = attempts
+        self.seconds = seconds
+
+    @property
+    def message(self):
+        """The last line of ``reason``, e.g. the exception of a traceback."""
+
+        return self.reason.strip().splitlines()[-1]
+
+    def __repr__(self):
+        return f'TaskFailure({self.message!r}, attempts={self.attempts})'
+
+
+def _worker_main(connection, initializer, initargs, start_lock):
+    if start_lock is not None:
+        # Report every FEMM instance the worker starts so it can be killed along with the worker.
+        backends.set_start_lock(start_lock)
+        backends.add_start_hook(lambda pid: connection.send(('backend', pid)))
+    if initializer is not None:
+        initializer(*initargs)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        function, task = message
+        try:
+            connection.send(('result', function(task)))
+        except Exception:
+            connection.send(('error', traceback.format_exc()))
+
+
+class _Worker:
+
+    def __init__(self, context, initializer, initargs, start_lock):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, daemon=True,
+                                       args=(child_connection, initializer, initargs, start_lock))
+        self.process.start()
+        child_connection.close()
+        self.task = None
+        self.started_at = None
+        self.backend_pids = set()
+
+    def submit(self, index, function, task):
+        self.task = index
+        self.started_at = time.perf_counter()
+        # Only the FEMM instances of the current task are killed, process ids are reused.
+        self.backend_pids = set()
+        self.connection.send((function, task))
+
+    def kill(self):
+        """Kill the worker and the FEMM instances started by its current task."""
+
+        for pid in self.backend_pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def close(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.connection.close()
+
+
+class WorkerPool:
+    """A pool of worker processes that can time out, retry and duplicate individual tasks.
+    Unlike ``multiprocessing.Pool`` a stuck task doesn't block the run: the worker running
+    it is killed and replaced.
+
+    With ``track_backends`` the workers report the process id of every FEMM instance they
+    start, so the instance is killed with its worker. Finding the id serialises starting
+    FEMM across the workers, so only enable it when tasks can be timed out or duplicated."""
+
+    def __init__(self, processes, initializer=None, initargs=(), context=None, track_backends=False):
+        self.context = context or mp.get_context()
+        self.initializer = initializer
+        self.initargs = initargs
+        self.start_lock = self.context.Lock() if track_backends else None
+        self.workers = [self._spawn() for _ in range(processes)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _spawn(self):
+        return _Worker(self.context, self.initializer, self.initargs, self.start_lock)
+
+    def _replace(self, worker):
+        worker.kill()
+        self.workers[self.workers.index(worker)] = self._spawn()
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+
+    def run(self, function, tasks, timeout=None, retries=0, speculate=False):
+        """Run ``function`` on every task and yield ``(index, result)`` pairs as tasks finish,
+        where ``index`` is the position of the task in ``tasks``. A task that raises, times
+        out after ``timeout`` seconds or kills its worker is retried up to ``retries`` times,
+        after which its result is a ``TaskFailure``. With ``speculate`` idle workers
+        duplicate straggling tasks once no tasks are left to start."""
+
+        pending = deque(range(len(tasks)))
+        attempts = [0] * len(tasks)
+        running = {}
+        finished = set()
+        # Tasks are only duplicated once, so a task that hangs on every copy still fails.
+        duplicated = set()
+        durations = []
+        longest_attempts = [0.0] * len(tasks)
+
+        def fail(index, reason, seconds):
+            longest_attempts[index] = max(longest_attempts[index], seconds)
+            if running.get(index):
+                # Another copy of the task is still running.
+                return []
+            if attempts[index] <= retries:
+                pending.appendleft(index)
+                return []
+            finished.add(index)
+            return [(index, TaskFailure(reason, attempts[index], longest_attempts[index]))]
+
+        def next_task(now):
+            if pending:
+                index = pending.popleft()
+                attempts[index] += 1
+                return index
+            if not speculate or len(durations) < SPECULATION_MINIMUM_SAMPLES:
+                return None
+            threshold = SPECULATION_FACTOR * statistics.median(durations)
+            stragglers = [(now - workers[0].started_at, index) for index, workers in running.items()
+                          if len(workers) == 1 and index not in duplicated and now - workers[0].started_at > threshold]
+            if not stragglers:
+                return None
+            index = max(stragglers)[1]
+            duplicated.add(index)
+            return index
+
+        while len(finished) < len(tasks):
+            now = time.perf_counter()
+            for worker in list(self.workers):
+                if worker.task is None:
+                    index = next_task(now)
+                    if index is None:
+                        break
+                    worker.submit(index, function, tasks[index])
+                    running.setdefault(index, []).append(worker)
+
+            busy = [worker for worker in self.workers if worker.task is not None]
+            wait_timeout = None
+            if timeout is not None:
+                wait_timeout = max(min(timeout - (now - worker.started_at) for worker in busy), 0)
+            if speculate:
+                # Keep an overdue worker's timeout of 0 rather than waiting a whole interval.
+                wait_timeout = SPECULATION_INTERVAL if wait_timeout is None else min(wait_timeout, SPECULATION_INTERVAL)
+            wait([worker.connection for worker in busy] + [worker.process.sentinel for worker in busy], wait_timeout)
+
+            outcomes = []
+            now = time.perf_counter()
+            for worker in busy:
+                index = worker.task
+                if index is None:
+                    # A duplicate killed earlier in this loop because the other copy finished.
+                    continue
+                try:
+                    message = None
+                    while worker.connection.poll():
+                        kind, value = worker.connection.recv()
+                        if kind == 'backend':
+                            worker.backend_pids.add(value)
+                        else:
+                            message = kind, value
+                            break
+                except (EOFError, OSError):
+                    message = None
+                if message is not None:
+                    kind, value = message
+                    worker.task = None
+                    running[index].remove(worker)
+                    if index in finished:
+                        continue
+                    if kind == 'result':
+                        finished.add(index)
+                        durations.append(now - worker.started_at)
+                        # Any other copy of the task is no longer needed.
+                        for duplicate in running.pop(index):
+                            duplicate.task = None
+                            self._replace(duplicate)
+                        outcomes.append((index, value))
+                    else:
+                        outcomes.extend(fail(index, value, now - worker.started_at))
+                elif not worker.process.is_alive():
+                    running[index].remove(worker)
+                    reason = f'The worker exited unexpectedly with exit code {worker.process.exitcode}.'
+                    self._replace(worker)
+                    outcomes.extend(fail(index, reason, now - worker.started_at))
+                elif timeout is not None and now - worker.started_at > timeout:
+                    running[index].remove(worker)
+                    self._replace(worker)
+                    outcomes.extend(fail(index, f'Timed out after {timeout} seconds.', now - worker.started_at))
+            yield from outcomes
@@ -0,0 +1,100 @@
+import os
+
+from .pool import WorkerPool, TaskFailure, get_context, DEFAULT_START_METHOD
+from .wrapper import FEMMSession
+
+# Each worker receives this many contiguous partitions of the tasks, so a slow
+# partition doesn't leave the other workers idle at the end.
+PARTITIONS_PER_WORKER = 4
+
+# The session of the post-processing worker, set once by ``_initialise_worker``.
+_worker = {}
+
+
+def _initialise_worker(backend, solution_path, directory):
+    """Start FEMM and open the solution once per worker."""
+
+    session = FEMMSession(backend=backend() if backend is not None else None, directory=directory)
+    session.open_document(solution_path)
+    _worker['session'] = session
+
+
+def _run_partition(tasks):
+    post = _worker['session'].post
+    return [task(post) for task in tasks]
+
+
+def partition(tasks, count):
+    """Split ``tasks`` into at most ``count`` contiguous partitions of near equal size."""
+
+    count = max(min(count, len(tasks)), 1)
+    size, remainder = divmod(len(tasks), count)
+    partitions = []
+    start = 0
+    for index in range(count):
+        end = start + size + (1 if index < remainder else 0)
+        partitions.append(tasks[start:end])
+        start = end
+    return partitions
+
+
+class ParallelPost:
+    """Evaluates post-processing tasks against one solution on a pool of worker processes,
+    each with its own FEMM instance that opens the solution once. A task is a picklable
+    callable (a module level function or a ``functools.partial`` of one) that is given
+    ``session.post`` and returns a value, e.g.::
+
+        def flux_density(post, x, y):
+            return post.get_point_values(x, y)[1:3]
+
+        with ParallelPost('motor.ans') as post:
+            values = post.map([partial(flux_density, x=x, y=0) for x in range(100)])
+
+    The tasks are split into contiguous partitions and the results are returned in the
+    order of the tasks. A task that raises makes ``map`` raise a ``RuntimeError``. The
+    workers are kept for the lifetime of the instance, so ``map`` can be called several
+    times. Workers can't start processes, so use it from a single run rather than from
+    the model of a scene."""
+
+    def __init__(self, solution_path, processes=None, backend=None, directory=None,
+                 start_method=DEFAULT_START_METHOD):
+        if not os.path.isabs(solution_path):
+            solution_path = os.path.join(directory or os.getcwd(), solution_path)
+        self.solution_path = solution_path
+        self.processes = processes or os.cpu_count()
+        self.backend = backend
+        self.directory = directory
+        self.start_method = start_method
+        self.pool = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        self.pool = WorkerPool(self.processes, initializer=_initialise_worker,
+                               initargs=(self.backend, self.solution_path, self.directory),
+                               context=get_context(self.start_method))
+
+    def map(self, tasks):
+        tasks = list(tasks)
+        if not tasks:
+            return []
+        if self.pool is None:
+            self.start()
+        partitions = partition(tasks, self.processes * PARTITIONS_PER_WORKER)
+        results = [None] * len(partitions)
+        for index, result in self.pool.run(_run_partition, partitions):
+            if isinstance(result, TaskFailure):
+                self.close()
+                raise RuntimeError(f'Post-processing of {self.solution_path} failed: {result.message}')
+            results[index] = result
+        return [value for partition_results in results for value in partition_results]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
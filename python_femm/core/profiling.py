@@ -0,0 +1,96 @@
+import time
+from functools import wraps
+
+import numpy as np
+
+COMMAND_CATEGORY = 'commands'
+METHOD_CATEGORY = 'methods'
+PHASE_CATEGORY = 'phases'
+
+# The phases a single ``call_femm`` is split into.
+FORMAT_PHASE = 'format'
+COM_PHASE = 'com'
+PARSE_PHASE = 'parse'
+
+PERCENTILES = (50, 90, 99)
+
+
+class Profiler:
+    """Records call counts and latencies for FEMM commands, wrapper methods and
+    the phases of each call (argument formatting, COM round trip and reply parsing)."""
+
+    def __init__(self):
+        self.samples = {}
+
+    def record(self, category, name, duration):
+        self.samples.setdefault(category, {}).setdefault(name, []).append(duration)
+
+    def reset(self):
+        self.samples = {}
+
+    def stats(self):
+        """Return a summary of every recorded name grouped by category. Each summary
+        contains the call count, the total, mean and maximum time and the 50th, 90th
+        and 99th percentile latencies, all in seconds."""
+
+        return {
+            category: {name: summarise(durations) for name, durations in names.items()}
+            for category, names in self.samples.items()
+        }
+
+    def instrument(self, api):
+        """Time every public method of ``api`` by shadowing it with a wrapper on the
+        instance. Nested calls (e.g. ``draw_line`` calling ``add_node``) are recorded
+        for each method, so the times are inclusive."""
+
+        for name in dir(type(api)):
+            if name.startswith('_'):
+                continue
+            method = getattr(api, name)
+            if callable(method):
+                setattr(api, name, self._wrap(method, f'{type(api).__name__}.{name}'))
+
+    def _wrap(self, method, name):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(METHOD_CATEGORY, name, time.perf_counter() - start)
+
+        return wrapper
+
+
+def summarise(durations):
+    durations = np.asarray(durations)
+    summary = {
+        'count': len(durations),
+        'total': float(durations.sum()),
+        'mean': float(durations.mean()),
+        'max': float(durations.max()),
+    }
+    for percentile, value in zip(PERCENTILES, np.percentile(durations, PERCENTILES)):
+        summary[f'p{percentile}'] = float(value)
+    return summary
+
+
+def format_stats(stats, limit=None):
+    """Format the output of ``Profiler.stats`` as tables ranked by total time."""
+
+    columns = ('count', 'total', 'mean', 'p50', 'p90', 'p99', 'max')
+    lines = []
+    for category in (PHASE_CATEGORY, COMMAND_CATEGORY, METHOD_CATEGORY):
+        summaries = stats.get(category)
+        if not summaries:
+            continue
+        ranked = sorted(summaries.items(), key=lambda item: item[1]['total'], reverse=True)[:limit]
+        name_width = max(len(category), *(len(name) for name, _ in ranked))
+        lines.append(f'{category.upper():<{name_width}}' + ''.join(f'{column:>12}' for column in columns))
+        for name, summary in ranked:
+            # Counts are printed as is, times are printed in milliseconds.
+            values = [f'{summary["count"]:>12}'] + [f'{summary[column] * 1e3:>12.3f}' for column in columns[1:]]
+            lines.append(f'{name:<{name_width}}' + ''.join(values))
+        lines.append('')
+    lines.append('Times are in milliseconds.')
+    return '\n'.join(lines)
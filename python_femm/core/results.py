@@ -0,0 +1,55 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class ResultSchema:
+    """Declares the dtype and shape of the value ``post`` returns for each scene point,
+    e.g. ``ResultSchema(dtype='float64', shape=(360,))`` for a waveform of 360 samples."""
+
+    def __init__(self, dtype=np.float64, shape=()):
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(shape)
+
+
+class SharedResults:
+    """A block of shared memory holding the result of every point of a scene. The runner
+    creates it and workers attach to it by name and write their result into its slot,
+    so results are not pickled back to the runner."""
+
+    def __init__(self, schema, grid_shape, name=None):
+        self.schema = schema
+        self.grid_shape = tuple(grid_shape)
+        if name is None:
+            size = max(int(np.prod(self.shape)) * schema.dtype.itemsize, 1)
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # Pool workers share the resource tracker of the runner, which unlinks the block.
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray(self.shape, dtype=schema.dtype, buffer=self.memory.buf)
+        if name is None:
+            self.array.fill(np.nan if schema.dtype.kind in 'fc' else 0)
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    @property
+    def shape(self):
+        return self.grid_shape + self.schema.shape
+
+    def write(self, index, value):
+        self.array[index] = value
+
+    def close(self):
+        self.array = None
+        try:
+            self.memory.close()
+        except BufferError:
+            # Arrays handed out by ``array`` are still alive, the mapping is released with them.
+            pass
+
+    def unlink(self):
+        self.close()
+        self.memory.unlink()
+
@@ -1,9 +1,10 @@
 import importlib
 import os
-import pywintypes
 import sys
 import time
 
+from .profiling import format_stats
+
 def _hold(stop_message):
     try:
         while True:
@@ -26,6 +27,8 @@ def run_pre(model_class, hold=False):
 
 
 def hot_reload_pre(model_module=None, model_name=None, root_dir=None):
+    import pywintypes
+
     sys.modules['model'] = model_module
     path = os.path.join(root_dir, 'model.py')
     most_recent_change = os.path.getmtime(path)
@@ -70,3 +73,15 @@ def run_post(pre_runner, hold=False):
     pre_runner.post()
     if hold:
         _hold('Postprocessor stopped.')
+
+
+def run_profile(model_class, stage):
+    print(f'Profiling {stage}...')
+    runner = model_class()
+    runner.start(profile=True)
+    runner.pre()
+    if stage in ('solve', 'post'):
+        runner.solve()
+    if stage == 'post':
+        runner.post()
+    print(format_stats(runner.session.stats()))
@@ -1,36 +1,184 @@
+import contextlib
 import multiprocessing as mp
+import os
 import time
-import _winapi
 
 import numpy as np
 
+from .costs import CostModel, COSTS_DIRECTORY
+from .pool import WorkerPool, TaskFailure, get_context, DEFAULT_START_METHOD, PRELOAD_MODULES
+from .results import SharedResults
+from .scratch import create_run_directory, create_worker_directory, promote, clear, remove_run_directory
+from .tracing import Tracer, Timeline, format_summary, START_STAGE, PRE_STAGE, SOLVE_STAGE, POST_STAGE, \
+    TRANSFER_STAGE
+
 TWO_DIMENSIONAL_MODE = '2d'
 THREE_DIMENSIONAL_MODE = '3d'
 
 
+# The scene and the options of the run, set once in each pool worker by ``_initialise_worker``.
+_worker = {}
+
+
+def _initialise_worker(scene, trace, shared_results, run_directory):
+    """Receive the scene and the options of the run once per worker rather than with
+    every point. ``shared_results`` is the name, schema and grid shape of the shared
+    result block when the scene declares a ``result_schema``. Each worker gets its own
+    scratch directory inside ``run_directory`` which FEMM works in."""
+
+    _worker['scene'] = scene
+    _worker['trace'] = trace
+    _worker['results'] = SharedResults(*shared_results) if shared_results is not None else None
+    _worker['directory'] = create_worker_directory(run_directory)
+    scene.model.working_directory = _worker['directory']
+
+
+def _run_point(task):
+    """Run a single scene point in a pool worker. The result is either written into
+    its slot of the shared result block or returned, and when tracing the span events
+    of the point are returned alongside it."""
+
+    index, slot, x_value, y_value = task
+    scene = _worker['scene']
+    shared_results = _worker['results']
+    scene.tracer = Tracer((x_value, y_value)) if _worker['trace'] else None
+    start = time.perf_counter()
+    try:
+        result = scene.run(x_value, y_value)
+        duration = time.perf_counter() - start
+        if scene.keep_solution(x_value, y_value):
+            if scene.solution_archive is not None:
+                scene.solution_archive.add_directory(_worker['directory'], f'{x_value}_{y_value}')
+            else:
+                promote(_worker['directory'], os.path.join(scene.solutions_dir, f'{x_value}_{y_value}'))
+    finally:
+        clear(_worker['directory'])
+    if shared_results is not None:
+        with scene.span(TRANSFER_STAGE):
+            shared_results.write(slot, result)
+        result = None
+    if scene.tracer is None:
+        return index, result, duration, None
+    # The transfer span of a returned result is closed by the runner once it arrives.
+    return index, result, duration, (scene.tracer, time.time() if shared_results is None else None)
+
+
 class SceneRunner:
+    """Runs every point of a scene on a pool of worker processes. Pass ``trace_path``
+    to write a Chrome trace of every stage of every point to that file and print a
+    summary of worker utilisation and stragglers.
+
+    When the scene declares a ``result_schema`` the results are written by the workers
+    into one block of shared memory and ``display_results`` receives a NumPy array of
+    shape ``(iterations,) + schema.shape`` (2D) or ``(iterations, iterations) + schema.shape``
+    (3D). The array is only valid during ``display_results``, copy it to keep it.
+
+    The duration of every point is recorded in ``costs_directory`` (see ``CostModel``) and,
+    unless ``order_by_cost`` is ``False``, points are submitted longest expected first. A
+    point that failed is recorded with the longest its attempts ran, e.g. its timeout.
+
+    Every worker runs FEMM in its own scratch directory created inside ``scratch_root``
+    (the system temporary directory by default, point it at a tmpfs or RAM disk to keep
+    mesh and solution files off the disk). The directory is emptied after each point and
+    removed at the end of the run, files are only kept for the points the scene selects
+    with ``keep_solution``.
+
+    A point that takes longer than ``timeout`` seconds has its worker and FEMM instance
+    killed, and a point that times out or raises is retried up to ``retries`` times. With
+    ``speculate`` idle workers duplicate straggling points once every point has started,
+    and the first copy to finish is used. A point that fails on every attempt doesn't stop
+    the run, its result is a ``TaskFailure`` (NaN in a shared result block) and it is
+    listed in ``failures``.
+
+    Workers are started with ``start_method``, ``'forkserver'`` by default on Linux and
+    macOS and ``'spawn'`` on Windows. ``PRELOAD_MODULES`` and the module of the scene are
+    imported once by the fork server and every worker is forked from it, which is much
+    faster than spawning a fresh interpreter for each."""
+
+    def __init__(self, trace_path=None, processes=None, order_by_cost=True, scratch_root=None, timeout=None,
+                 retries=0, speculate=False, start_method=DEFAULT_START_METHOD, costs_directory=COSTS_DIRECTORY):
+        self.trace_path = trace_path
+        self.processes = processes or mp.cpu_count()
+        self.order_by_cost = order_by_cost
+        self.scratch_root = scratch_root
+        self.timeout = timeout
+        self.retries = retries
+        self.speculate = speculate
+        self.start_method = start_method
+        self.costs_directory = costs_directory
+        self.failures = {}
 
     def start(self, scene_class):
         mode = scene_class.mode.lower()
         iterations = scene_class.iterations
-        instance_count = iterations if mode == TWO_DIMENSIONAL_MODE else iterations ** 2
-
-        print(f'Running scene with {instance_count} instances, on {mp.cpu_count()} processes...')
-        mp.set_executable(_winapi.GetModuleFileName(0))
-        start_time = time.perf_counter()
-        results = []
-        with mp.Pool(mp.cpu_count()) as pool:
-            if mode == TWO_DIMENSIONAL_MODE:
-                results = [pool.starmap(scene_class.run, [(x_iteration, 0) for x_iteration in range(iterations)]), []]
-            elif mode == THREE_DIMENSIONAL_MODE:
-                for x_iteration in range(iterations):
-                    results.append(pool.starmap(scene_class.run,
-                                                [(x_iteration, y_iteration) for y_iteration in range(iterations)]))
+        if mode == TWO_DIMENSIONAL_MODE:
+            points = [(x_iteration, 0) for x_iteration in range(iterations)]
+            grid_shape = (iterations,)
+        elif mode == THREE_DIMENSIONAL_MODE:
+            points = [(x_iteration, y_iteration) for x_iteration in range(iterations)
+                      for y_iteration in range(iterations)]
+            grid_shape = (iterations, iterations)
+        else:
+            raise ValueError('Mode must be either 2D or 3D.')
+
+        print(f'Running scene with {len(points)} instances, on {self.processes} processes...')
+        context = get_context(self.start_method, [*PRELOAD_MODULES, type(scene_class).__module__])
+        trace = self.trace_path is not None
+        cost_model = CostModel.for_scene(scene_class, self.costs_directory)
+        timeline = Timeline() if trace else None
+        schema = scene_class.result_schema
+        shared_results = SharedResults(schema, grid_shape) if schema is not None else None
+        run_directory = create_run_directory(self.scratch_root)
+        try:
+            start_time = time.perf_counter()
+            point_results = [None] * len(points)
+            worker_args = (scene_class, trace, None if shared_results is None else
+                           (schema, grid_shape, shared_results.name), run_directory)
+            self.failures = {}
+            with WorkerPool(self.processes, initializer=_initialise_worker, initargs=worker_args, context=context,
+                            track_backends=self.timeout is not None or self.speculate) as pool:
+                order = cost_model.order(iterations, points) if self.order_by_cost else range(len(points))
+                tasks = [(index, points[index][:len(grid_shape)], *points[index]) for index in order]
+                for position, outcome in pool.run(_run_point, tasks, timeout=self.timeout, retries=self.retries,
+                                                  speculate=self.speculate):
+                    if isinstance(outcome, TaskFailure):
+                        index = tasks[position][0]
+                        point_results[index] = outcome
+                        self.failures[points[index]] = outcome
+                        # The point took at least this long, so the next run starts it early.
+                        cost_model.record(iterations, points[index], outcome.seconds)
+                        continue
+                    index, result, duration, spans = outcome
+                    point_results[index] = result
+                    cost_model.record(iterations, points[index], duration)
+                    if trace:
+                        tracer, sent_at = spans
+                        if sent_at is not None:
+                            tracer.add(TRANSFER_STAGE, sent_at, time.time())
+                        timeline.add_events(tracer.events)
+            end_time = time.perf_counter()
+            print(f'Finished in {np.round(end_time - start_time)} seconds.')
+            for (x_value, y_value), failure in self.failures.items():
+                print(f'Point ({x_value}, {y_value}) failed after {failure.attempts} attempt(s): {failure.message}')
+            cost_model.save()
+
+            if shared_results is not None:
+                results = shared_results.array
+            elif mode == TWO_DIMENSIONAL_MODE:
+                results = [point_results, []]
             else:
-                raise ValueError('Mode must be either 2D or 3D.')
-        end_time = time.perf_counter()
-        print(f'Finished in {np.round(end_time - start_time)} seconds.')
-        self.end(scene_class, results)
+                results = [point_results[index:index + iterations] for index in range(0, len(points), iterations)]
+            if trace:
+                timeline.finish()
+                timeline.write(self.trace_path)
+                print(f'Trace written to {self.trace_path}.')
+                print(format_summary(timeline.summary()))
+            self.end(scene_class, results)
+        finally:
+            remove_run_directory(run_directory)
+            if shared_results is not None:
+                results = None
+                shared_results.unlink()
 
     def end(self, scene_class, results):
         print(f'Displaying results...')
@@ -41,16 +189,41 @@ class Scene:
     model = None
     iterations = None
     mode = None
+    # A ``ResultSchema`` to collect the results in shared memory, see ``SceneRunner``.
+    result_schema = None
+    # Where the files of the points selected by ``keep_solution`` are copied to.
+    solutions_dir = 'solutions'
+    # A ``SolutionArchive`` to store the solutions selected by ``keep_solution`` in instead.
+    solution_archive = None
+    tracer = None
 
     def vary(self, start, end, value):
         increment = (end - start) / self.iterations
         return start + (value * increment)
 
+    def span(self, name):
+        """Record the enclosed block as a span when the scene is being traced."""
+
+        if self.tracer is None:
+            return contextlib.nullcontext()
+        return self.tracer.span(name)
+
     def run(self, x_value, y_value):
-        self.model.start()
-        self.model.pre(x_value=x_value, y_value=y_value)
-        self.model.solve()
-        return self.model.post()
+        with self.span(START_STAGE):
+            self.model.start()
+        self.model.point = (x_value, y_value)
+        with self.span(PRE_STAGE):
+            self.model.pre(x_value=x_value, y_value=y_value)
+        with self.span(SOLVE_STAGE):
+            self.model.solve()
+        with self.span(POST_STAGE):
+            return self.model.post()
+
+    def keep_solution(self, x_value, y_value):
+        """Return ``True`` to copy the input and solution files of this point from the
+        scratch directory to ``solutions_dir/<x_value>_<y_value>``."""
+
+        return False
 
     def get_axis(self, start, end):
         return np.linspace(start, end, self.iterations)
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+
+# Input and solution files of the four problem types.
+SOLUTION_EXTENSIONS = ('.fem', '.ans', '.fee', '.res', '.feh', '.anh', '.fec', '.anc')
+
+
+def create_run_directory(root=None):
+    """Create the scratch directory of a scene run inside ``root``, e.g. a tmpfs such as
+    ``/dev/shm`` or a RAM disk, defaulting to the system temporary directory."""
+
+    if root is not None:
+        os.makedirs(root, exist_ok=True)
+    return tempfile.mkdtemp(prefix='python-femm-', dir=root)
+
+
+def create_worker_directory(run_directory):
+    """Create a directory for the current worker process inside ``run_directory``."""
+
+    directory = os.path.join(run_directory, f'worker-{os.getpid()}')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def promote(directory, destination, extensions=SOLUTION_EXTENSIONS):
+    """Copy the input and solution files in ``directory`` to ``destination``."""
+
+    os.makedirs(destination, exist_ok=True)
+    for file_name in os.listdir(directory):
+        if os.path.splitext(file_name)[1].lower() in extensions:
+            shutil.copy2(os.path.join(directory, file_name), destination)
+
+
+def clear(directory):
+    """Remove everything in ``directory`` so the next point starts from an empty directory."""
+
+    for file_name in os.listdir(directory):
+        path = os.path.join(directory, file_name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                # FEMM may still hold the file open, it is removed with the run directory.
+                pass
+
+
+def remove_run_directory(run_directory):
+    shutil.rmtree(run_directory, ignore_errors=True)
@@ -0,0 +1,119 @@
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+# Stages of ``Scene.run`` plus the transfer of the result back to the runner.
+START_STAGE = 'start'
+PRE_STAGE = 'pre'
+SOLVE_STAGE = 'solve'
+POST_STAGE = 'post'
+TRANSFER_STAGE = 'transfer'
+
+# A point is a straggler when it takes this many times longer than the median point.
+STRAGGLER_FACTOR = 2
+
+
+class Tracer:
+    """Collects span events for a single scene point. Times are wall clock seconds so
+    that spans recorded in different worker processes can be merged."""
+
+    def __init__(self, point):
+        self.point = point
+        self.pid = os.getpid()
+        self.events = []
+
+    @contextmanager
+    def span(self, name):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.time())
+
+    def add(self, name, start, end):
+        self.events.append({'name': name, 'start': start, 'end': end, 'pid': self.pid, 'point': self.point})
+
+
+class Timeline:
+    """Merges the span events of every scene point into one timeline."""
+
+    def __init__(self):
+        self.start = time.time()
+        self.end = None
+        self.events = []
+
+    def add_events(self, events):
+        self.events.extend(events)
+
+    def finish(self):
+        self.end = time.time()
+
+    def to_chrome_trace(self):
+        """Return the timeline in the Chrome trace event format, which can be opened
+        with ``chrome://tracing`` or https://ui.perfetto.dev."""
+
+        trace_events = [
+            {'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': f'Worker {pid}'}}
+            for pid in sorted({event['pid'] for event in self.events})
+        ]
+        for event in self.events:
+            x_value, y_value = event['point']
+            trace_events.append({
+                'name': event['name'],
+                'cat': 'scene',
+                'ph': 'X',
+                'ts': (event['start'] - self.start) * 1e6,
+                'dur': (event['end'] - event['start']) * 1e6,
+                'pid': event['pid'],
+                'tid': 0,
+                'args': {'x': x_value, 'y': y_value},
+            })
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def summary(self):
+        """Return the utilisation of every worker (the fraction of the wall time spent
+        running points) and the points taking longer than ``STRAGGLER_FACTOR`` times
+        the median point."""
+
+        wall_time = (self.end or time.time()) - self.start
+        busy = {}
+        points = {}
+        for event in self.events:
+            duration = event['end'] - event['start']
+            if event['name'] != TRANSFER_STAGE:
+                busy[event['pid']] = busy.get(event['pid'], 0) + duration
+            points[event['point']] = points.get(event['point'], 0) + duration
+        median = statistics.median(points.values()) if points else 0
+        stragglers = sorted(
+            ((point, duration) for point, duration in points.items() if duration > STRAGGLER_FACTOR * median),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        return {
+            'wall_time': wall_time,
+            'utilisation': {pid: duration / wall_time for pid, duration in busy.items()},
+            'median_point_time': median,
+            'stragglers': stragglers,
+        }
+
+
+def format_summary(summary):
+    lines = [f'Wall time: {summary["wall_time"]:.2f} s']
+    utilisation = summary['utilisation']
+    if utilisation:
+        mean_utilisation = sum(utilisation.values()) / len(utilisation)
+        lines.append(f'Mean worker utilisation: {mean_utilisation:.0%} across {len(utilisation)} workers')
+        for pid, value in sorted(utilisation.items()):
+            lines.append(f'  Worker {pid}: {value:.0%}')
+    lines.append(f'Median point time: {summary["median_point_time"]:.2f} s')
+    if summary['stragglers']:
+        lines.append(f'Stragglers (more than {STRAGGLER_FACTOR}x the median):')
+        for (x_value, y_value), duration in summary['stragglers']:
+            lines.append(f'  ({x_value}, {y_value}): {duration:.2f} s')
+    return '\n'.join(lines)
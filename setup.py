@@ -11,7 +11,7 @@ setuptools.setup(
     description='A Python framework for FEMM 4.2',
     long_description=long_description,
     long_description_content_type='text/markdown',
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=['benchmarks', 'benchmarks.*']),
     entry_points={'console_scripts': [
         'python-femm = python_femm.core.manage:execute_from_command_line',
     ]},
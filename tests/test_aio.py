@@ -0,0 +1,69 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from python_femm.core.aio import AsyncFEMMSession, run_pipeline
+from python_femm.core.backends import DummyBackend
+from python_femm.core.model import Model
+
+
+class RecordingBackend(DummyBackend):
+
+    def __init__(self):
+        super().__init__()
+        self.thread_name = threading.current_thread().name
+        self.calls = []
+
+    def mlab2femm(self, string):
+        self.calls.append(string)
+        return super().mlab2femm(string)
+
+
+class PointModel(Model):
+    backend = RecordingBackend
+
+    def pre(self, x_value=None, y_value=None):
+        self.session.new_document('magnetics')
+
+    def solve(self):
+        self.session.pre.analyze()
+
+    def post(self):
+        return self.point, self.working_directory, self.session.backend.calls[0]
+
+
+def test_backend_is_created_on_the_session_thread():
+    async def start():
+        async with AsyncFEMMSession(backend=RecordingBackend) as femm:
+            return femm.session.backend.thread_name
+
+    assert asyncio.run(start()).startswith('femm')
+
+
+def test_pipeline_sets_the_point_and_gives_each_session_its_own_directory():
+    points = [(0, 0), (1, 0), (2, 0), (3, 0)]
+    results = asyncio.run(run_pipeline(PointModel, points, session_count=2))
+    assert [point for point, _, _ in results] == points
+    directories = {directory for _, directory, _ in results}
+    assert len(directories) == 2
+    for _, directory, first_call in results:
+        assert directory.replace('\\', '/') in first_call
+
+
+class FailingModel(PointModel):
+    directory_checks = []
+
+    def post(self):
+        if self.point == (0, 0):
+            raise ValueError('Point failed.')
+        time.sleep(0.3)
+        self.directory_checks.append(os.path.isdir(self.working_directory))
+
+
+def test_failing_point_waits_for_other_sessions_before_cleaning_up():
+    with pytest.raises(ValueError):
+        asyncio.run(run_pipeline(FailingModel, [(0, 0), (1, 0)], session_count=2))
+    assert FailingModel.directory_checks == [True]
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pytest
+
+from python_femm.core.archive import ParsedSolution, SolutionArchive
+
+HEADER = '[Format] = 4.0\n[Frequency] = 0\n[BlockLabels] = 1\n  0.5\t0.5\t1\t-1\t0\t0\t0\t1\t0\n[Solution]\n'
+ELEMENTS = '2\n0\t1\t2\t0\n0\t2\t3\t0\n'
+TAIL = '0\n'
+
+
+def _write(path, values, newline='\n'):
+    nodes = [('0', '0'), ('1', '0'), ('1', '0.1'), ('-2.5', '1e-05')]
+    text = HEADER + '4\n' + ''.join(f'{x}\t{y}\t{value}\n' for (x, y), value in zip(nodes, values))
+    text += ELEMENTS + TAIL
+    with open(path, 'w', newline='') as f:
+        f.write(text.replace('\n', newline))
+    return path
+
+
+def _read(path):
+    with open(path, newline='') as f:
+        return f.read()
+
+
+def test_restored_solution_is_identical_to_the_original(tmp_path):
+    path = _write(tmp_path / 'motor.ans', ['0.1', '3', '-0.0012', '1.5e-300'])
+    archive = SolutionArchive(str(tmp_path / 'archive'))
+    archive.add('point', str(path))
+    restored = archive.restore('point', str(tmp_path / 'restored'))
+    assert os.path.basename(restored) == 'motor.ans'
+    assert _read(restored) == _read(path)
+
+
+def test_windows_newlines_are_kept(tmp_path):
+    path = _write(tmp_path / 'motor.ans', ['0.1', '3', '-0.0012', '7'], newline='\r\n')
+    archive = SolutionArchive(str(tmp_path / 'archive'))
+    archive.add('point', str(path))
+    assert _read(archive.restore('point', str(tmp_path / 'restored'))) == _read(path)
+
+
+def test_values_written_with_17_digits_keep_their_value(tmp_path):
+    path = _write(tmp_path / 'motor.ans', ['%.17g' % 0.1, '3', '-0.0012', '7'])
+    archive = SolutionArchive(str(tmp_path / 'archive'))
+    archive.add('point', str(path))
+    restored = ParsedSolution.read(archive.restore('point', str(tmp_path / 'restored')))
+    np.testing.assert_array_equal(restored.nodes, ParsedSolution.read(str(path)).nodes)
+
+
+def test_solutions_with_the_same_geometry_share_a_mesh(tmp_path):
+    archive = SolutionArchive(str(tmp_path / 'archive'))
+    for current in range(3):
+        archive.add(f'current_{current}', str(_write(tmp_path / f'{current}.ans', [current, 1, 2, 3])))
+    assert archive.keys() == ['current_0', 'current_1', 'current_2']
+    assert len(os.listdir(tmp_path / 'archive' / 'meshes')) == 1
+
+    coordinates, elements = archive.mesh('current_2')
+    np.testing.assert_array_equal(coordinates, [[0, 0], [1, 0], [1, 0.1], [-2.5, 1e-05]])
+    np.testing.assert_array_equal(elements, [[0, 1, 2, 0], [0, 2, 3, 0]])
+    assert elements.dtype == np.int32
+    np.testing.assert_array_equal(archive.values('current_2'), [[2], [1], [2], [3]])
+
+
+def test_a_file_without_a_solution_is_rejected(tmp_path):
+    path = tmp_path / 'motor.fem'
+    path.write_text('[Format] = 4.0\n')
+    with pytest.raises(ValueError):
+        SolutionArchive(str(tmp_path / 'archive')).add('point', str(path))
@@ -0,0 +1,33 @@
+from python_femm.core.backends import DummyBackend
+from python_femm.core.wrapper import FEMMSession
+
+
+class RecordingBackend(DummyBackend):
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def mlab2femm(self, string):
+        self.calls.append(string)
+        return super().mlab2femm(string)
+
+
+def _session(doctype='magnetics'):
+    session = FEMMSession(backend=RecordingBackend())
+    session.new_document(doctype)
+    return session
+
+
+def test_magnetics_boundary_prop_matches_the_manual():
+    session = _session()
+    session.pre.add_boundary_prop(prop_name='Periodic', boundary_format=4)
+    assert session.backend.calls[-1] == 'mi_addboundprop("Periodic", 0, 0, 0, 0, 0, 0, 0, 0, 4)'
+    session.pre.add_boundary_prop(prop_name='Air gap', boundary_format=6, inner_angle=0, outer_angle=7.5)
+    assert session.backend.calls[-1] == 'mi_addboundprop("Air gap", 0, 0, 0, 0, 0, 0, 0, 0, 6, 0, 7.5)'
+
+
+def test_complex_numbers_are_sent_with_lua_imaginary_unit():
+    session = _session()
+    session.pre.add_boundary_prop(prop_name='Mixed', c_0=complex(1, -2), c_1=0.5j, boundary_format=2)
+    assert session.backend.calls[-1] == 'mi_addboundprop("Mixed", 0, 0, 0, 0, 0, 0, 1.0-I*2.0, 0.0+I*0.5, 2)'
@@ -0,0 +1,20 @@
+import pickle
+
+import numpy as np
+
+from python_femm.core.fields import FieldMap
+
+
+def test_field_map_is_mapped_once_and_pickles_without_the_mapping(tmp_path):
+    path = str(tmp_path / 'field.npy')
+    np.save(path, np.arange(12.0).reshape(3, 4))
+    field_map = FieldMap(path)
+    assert field_map[1, 2] == 6.0
+    assert field_map.array is field_map.array
+    assert field_map.shape == (3, 4)
+
+    data = pickle.dumps(field_map)
+    assert len(data) < 1000
+    restored = pickle.loads(data)
+    assert restored._array is None
+    np.testing.assert_array_equal(np.asarray(restored), np.arange(12.0).reshape(3, 4))
@@ -0,0 +1,27 @@
+import time
+
+from python_femm.core.pool import WorkerPool, TaskFailure
+
+
+def _slow_task(index):
+    time.sleep(1.0 if index == 0 else 0.05)
+    return index * 2
+
+
+def _stuck_task(index):
+    time.sleep(60 if index == 0 else 0.01)
+    return index
+
+
+def test_speculative_duplicate_is_discarded_when_the_original_finishes():
+    with WorkerPool(3) as pool:
+        results = dict(pool.run(_slow_task, list(range(6)), speculate=True))
+    assert results == {index: index * 2 for index in range(6)}
+
+
+def test_timed_out_task_fails_without_stopping_the_run():
+    with WorkerPool(2) as pool:
+        results = dict(pool.run(_stuck_task, list(range(4)), timeout=0.5))
+    assert isinstance(results[0], TaskFailure)
+    assert results[0].seconds >= 0.5
+    assert [results[index] for index in range(1, 4)] == [1, 2, 3]
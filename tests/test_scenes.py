@@ -0,0 +1,42 @@
+import contextlib
+import io
+import time
+
+from python_femm.core.backends import DummyBackend
+from python_femm.core.costs import CostModel
+from python_femm.core.model import Model
+from python_femm.core.pool import TaskFailure
+from python_femm.core.scenes import Scene, SceneRunner
+
+
+class HangingModel(Model):
+    backend = DummyBackend
+
+    def pre(self, x_value=None, y_value=None):
+        time.sleep(60 if x_value == 0 else 0.01)
+
+    def solve(self):
+        pass
+
+    def post(self):
+        return 1.0
+
+
+class HangingScene(Scene):
+    model = HangingModel()
+    iterations = 3
+    mode = '2d'
+
+    def display_results(self, results):
+        HangingScene.results = results
+
+
+def test_timed_out_point_is_recorded_with_a_lower_bound_cost(tmp_path):
+    scene = HangingScene()
+    runner = SceneRunner(processes=2, timeout=0.5, costs_directory=str(tmp_path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.start(scene)
+    assert isinstance(runner.failures[(0, 0)], TaskFailure)
+    durations = CostModel.for_scene(scene, str(tmp_path)).durations
+    assert durations[(3, 0, 0)] >= 0.5
+    assert durations[(3, 0, 0)] > max(durations[(3, 1, 0)], durations[(3, 2, 0)])
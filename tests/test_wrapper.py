@@ -0,0 +1,18 @@
+import math
+
+from python_femm.core.wrapper import FEMMSession
+
+
+def test_msvc_nan_and_infinity_are_parsed():
+    nan, inf = FEMMSession._parse_reply('[ -1.#IND00 1.#INF ]')
+    assert math.isnan(nan)
+    assert inf == math.inf
+
+
+def test_complex_values_are_parsed():
+    assert FEMMSession._parse_reply('[ 1e-05-I*3.5e-07 2 ]') == [complex(1e-05, -3.5e-07), 2]
+    assert FEMMSession._parse_reply('[ 1.5+I*2 ]') == complex(1.5, 2)
+
+
+def test_unparseable_tokens_are_kept_as_strings():
+    assert FEMMSession._parse_reply('[ 1+I*x ]') == '1+I*x'